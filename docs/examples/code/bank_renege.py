@@ -40,12 +40,15 @@ def customer(env, name, counter, time_in_bank):
     with counter.request() as req:
         patience = random.uniform(MIN_PATIENCE, MAX_PATIENCE)
         # Wait for the counter or abort at the end of our tether
-        results = yield req | env.timeout(patience)
+        renege = env.timeout(patience)
+        results = yield req | renege
 
         wait = env.now - arrive
 
         if req in results:
-            # We got to the counter
+            # We got to the counter and no longer need to wait for reneging
+            if not renege.processed:
+                renege.cancel()
             print('%7.4f %s: Waited %6.3f' % (env.now, name, wait))
 
             tib = random.expovariate(1.0 / time_in_bank)
@@ -12,12 +12,15 @@ from pkgutil import extend_path
 
 from simpy.core import Environment
 from simpy.rt import RealtimeEnvironment
-from simpy.events import Event, Timeout, Process, AllOf, AnyOf, Interrupt
+from simpy.events import (
+    Event, Timeout, Periodic, Process, CallbackProcess, AllOf, AnyOf,
+    Interrupt)
 from simpy.resources.resource import (
     Resource, PriorityResource, PreemptiveResource)
 from simpy.resources.container import Container
 from simpy.resources.store import (
-    Store, PriorityItem, PriorityStore, FilterStore)
+    Store, PriorityItem, PriorityStore, FilterStore, KeyedStore)
+from simpy.replication import replicate, Replication
 
 
 def compile_toc(entries, section_marker='='):
@@ -37,11 +40,15 @@ toc = (
         Environment, RealtimeEnvironment,
     )),
     ('Events', (
-        Event, Timeout, Process, AllOf, AnyOf, Interrupt,
+        Event, Timeout, Periodic, Process, CallbackProcess, AllOf, AnyOf,
+        Interrupt,
     )),
     ('Resources', (
         Resource, PriorityResource, PreemptiveResource, Container, Store,
-        PriorityItem, PriorityStore, FilterStore,
+        PriorityItem, PriorityStore, FilterStore, KeyedStore,
+    )),
+    ('Replications', (
+        replicate, Replication,
     )),
 )
 
@@ -6,6 +6,17 @@ import sys
 
 
 PY2 = sys.version_info[0] == 2
+HAS_AWAIT = sys.version_info >= (3, 5)
+
+
+if HAS_AWAIT:
+    # Generators can't return a value in Python 2, so the implementation of
+    # Event.__await__() is compiled at runtime.
+    exec('''def await_event(event):
+    """Suspend the awaiting coroutine until *event* has been processed and
+    return the value of *event*."""
+    return (yield event)
+''')
 
 
 if PY2:  # NOQA
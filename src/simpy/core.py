@@ -3,11 +3,14 @@ Core components for event-discrete simulation environments.
 
 """
 import types
+from collections import deque
 from heapq import heappush, heappop
-from itertools import count
+from itertools import count, repeat
+from operator import index
 
-from simpy.events import (AllOf, AnyOf, Event, Process, Timeout, URGENT,
-                          NORMAL)
+from simpy.events import (AllOf, AnyOf, CallbackProcess, Event, Periodic,
+                          Process, Timeout, URGENT, NORMAL)
+from simpy.queues import HeapQueue
 
 
 Infinity = float('inf')  #: Convenience alias for infinity
@@ -161,15 +164,50 @@ class Environment(BaseEnvironment):
     You can provide an *initial_time* for the environment. By default, it
     starts at ``0``.
 
+    Scheduled events are stored in the *queue*, which must be an
+    :class:`~simpy.queues.EventQueue` instance. By default, a new
+    :class:`~simpy.queues.HeapQueue` is used. Events scheduled for the current
+    time with priority :data:`~simpy.events.URGENT` or
+    :data:`~simpy.events.NORMAL` bypass the queue and are kept in a FIFO lane
+    per priority. This does not change the order in which events are
+    processed.
+
+    If a *resolution* is given, the environment uses integer time. The time
+    is then counted in ticks of length *resolution* (in the time unit of your
+    model, e.g., ``1e-9`` for nanoseconds in a model using seconds). The
+    *initial_time*, all delays and numeric *until* values of :meth:`run()`
+    must be integers. A :exc:`TypeError` is raised otherwise. Integer time is
+    exact, so events never drift apart because of rounding errors. The
+    :meth:`to_ticks()` and :meth:`from_ticks()` methods convert between the
+    time unit of the model and ticks.
+
     This class also provides aliases for common event types, for example
     :attr:`process`, :attr:`timeout` and :attr:`event`.
 
     """
-    def __init__(self, initial_time=0):
+    def __init__(self, initial_time=0, queue=None, resolution=None):
+        if resolution is not None:
+            if not resolution > 0:
+                raise ValueError('resolution(=%s) must be > 0.' % resolution)
+            initial_time = index(initial_time)
+        self._resolution = resolution
         self._now = initial_time
-        self._queue = []  # The list of all currently scheduled events.
+        # The queue of all currently scheduled events.
+        self._queue = HeapQueue() if queue is None else queue
+        # The default heap queue is accessed directly via heapq.
+        self._heap = type(self._queue) is HeapQueue
+        # Events scheduled for the current time with URGENT and NORMAL
+        # priority. They are processed in FIFO order before any event of the
+        # queue with the same time and a larger priority.
+        self._urgent = deque()
+        self._normal = deque()
+        # Scheduled events that have been cancelled but are still queued.
+        self._cancelled = set()
         self._eid = count()  # Counter for event IDs
+        self._processed = 0  # Number of processed events
         self._active_proc = None
+        self._tracer = None
+        self._profiler = None
 
         # Bind all BoundClass instances to "self" to improve performance.
         BoundClass.bind_early(self)
@@ -184,39 +222,188 @@ class Environment(BaseEnvironment):
         """The currently active process of the environment."""
         return self._active_proc
 
+    @property
+    def resolution(self):
+        """The length of a tick if the environment uses integer time or
+        ``None`` otherwise."""
+        return self._resolution
+
+    @property
+    def tracer(self):
+        """The tracer that records every processed event (e.g.,
+        a :class:`~simpy.trace.TraceBuffer`) or ``None`` if events are not
+        traced. It can be set or reset at any time."""
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer):
+        self._tracer = tracer
+
+    @property
+    def profiler(self):
+        """The profiler that measures the time spent in each resumed process
+        (e.g., a :class:`~simpy.profiler.Profiler`) or ``None`` if processes
+        are not profiled. It can be set or reset at any time."""
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler):
+        self._profiler = profiler
+
+    def to_ticks(self, time):
+        """Convert *time* from the time unit of the model into the nearest
+        number of ticks."""
+        return int(round(time / self._resolution))
+
+    def from_ticks(self, ticks):
+        """Convert a number of *ticks* into the time unit of the model."""
+        return ticks * self._resolution
+
     process = BoundClass(Process)
+    callback_process = BoundClass(CallbackProcess)
     timeout = BoundClass(Timeout)
+    every = BoundClass(Periodic)
     event = BoundClass(Event)
     all_of = BoundClass(AllOf)
     any_of = BoundClass(AnyOf)
 
+    _purge_min = 64
+    """Minimum number of cancelled events before they get purged from the
+    queue."""
+
     def schedule(self, event, priority=NORMAL, delay=0):
         """Schedule an *event* with a given *priority* and a *delay*."""
-        heappush(self._queue,
-                 (self._now + delay, priority, next(self._eid), event))
+        if self._resolution is not None:
+            delay = index(delay)
+        now = self._now
+        item = (now + delay, priority, next(self._eid), event)
+        if item[0] == now:
+            # Events for the current time are scheduled after all events that
+            # are already queued for it, so a FIFO suffices for them.
+            if priority == NORMAL:
+                self._normal.append(item)
+                return
+            elif priority == URGENT:
+                self._urgent.append(item)
+                return
+
+        if self._heap:
+            heappush(self._queue, item)
+        else:
+            self._queue.push(item)
 
     def peek(self):
         """Get the time of the next scheduled event. Return
         :data:`~simpy.core.Infinity` if there is no further event."""
         try:
-            return self._queue[0][0]
+            return self._peek_item()[0]
         except IndexError:
             return Infinity
 
+    def _peek_item(self):
+        """Return the ``(time, priority, eid, event)`` tuple of the next
+        scheduled event without removing it.
+
+        Raise an :exc:`IndexError` if there are no further events.
+
+        """
+        cancelled = self._cancelled
+        queue = self._queue
+        while True:
+            lane = self._urgent or self._normal
+            if lane:
+                item = lane[0]
+                if len(queue):
+                    head = queue.peek()
+                    if head[0] == self._now and head[1] <= item[1]:
+                        lane, item = None, head
+            else:
+                lane, item = None, queue.peek()
+
+            if not cancelled or item[3] not in cancelled:
+                return item
+
+            # Drop the cancelled event.
+            cancelled.remove(item[3])
+            if lane:
+                lane.popleft()
+            else:
+                queue.pop()
+
+    def _cancel(self, event):
+        """Cancel the scheduled *event*.
+
+        The event is only marked as cancelled and skipped once it is taken
+        from the queue. If cancelled events make up more than half of all
+        scheduled events, they are purged from the queue.
+
+        """
+        cancelled = self._cancelled
+        cancelled.add(event)
+        if len(cancelled) < self._purge_min:
+            return
+        size = len(self._queue) + len(self._urgent) + len(self._normal)
+        if 2 * len(cancelled) > size:
+            self._queue.purge(cancelled)
+            # The lanes are filtered in place, as run() keeps references to
+            # them.
+            for lane in (self._urgent, self._normal):
+                items = [item for item in lane if item[3] not in cancelled]
+                lane.clear()
+                lane.extend(items)
+            cancelled.clear()
+
+    def _pop_item(self):
+        """Remove and return the ``(time, priority, eid, event)`` tuple of the
+        next scheduled event that has not been cancelled.
+
+        Raise an :exc:`EmptySchedule` if there are no further events.
+
+        """
+        cancelled = self._cancelled
+        queue = self._queue
+        while True:
+            lane = self._urgent or self._normal
+            if lane:
+                # Queued events for the current time precede the lane if
+                # their priority is not larger, as they have been scheduled
+                # earlier.
+                if len(queue):
+                    head = queue[0] if self._heap else queue.peek()
+                    if head[0] == self._now and head[1] <= lane[0][1]:
+                        lane = None
+                if lane:
+                    item = lane.popleft()
+                elif self._heap:
+                    item = heappop(queue)
+                else:
+                    item = queue.pop()
+            else:
+                try:
+                    item = heappop(queue) if self._heap else queue.pop()
+                except IndexError:
+                    raise EmptySchedule()
+
+            if not cancelled or item[3] not in cancelled:
+                return item
+            # Skip the cancelled event.
+            cancelled.remove(item[3])
+
     def step(self):
         """Process the next event.
 
         Raise an :exc:`EmptySchedule` if no further events are available.
 
         """
-        try:
-            self._now, _, _, event = heappop(self._queue)
-        except IndexError:
-            raise EmptySchedule()
+        now, priority, eid, event = self._pop_item()
+        self._now = now
+        self._processed += 1
 
         # Process callbacks of the event. Set the events callbacks to None
         # immediately to prevent concurrent modifications.
         callbacks, event.callbacks = event.callbacks, None
+        if self._tracer is not None:
+            self._tracer.record(now, priority, eid, event, callbacks)
         for callback in callbacks:
             callback(event)
 
@@ -227,3 +414,171 @@ class Environment(BaseEnvironment):
             exc = type(event._value)(*event._value.args)
             exc.__cause__ = event._value
             raise exc
+
+    def run(self, until=None, max_steps=None):
+        """Executes :meth:`step()` until the given criterion *until* is met.
+
+        *until* is handled as in :meth:`BaseEnvironment.run()`. If *max_steps*
+        is not ``None``, at most *max_steps* events are processed. If this
+        limit is reached before *until* is met, the method returns ``None``
+        and the simulation can be continued by calling :meth:`run()` again.
+
+        The event processing of :meth:`step()` is inlined into the loop of
+        this method. If :meth:`step()` is overridden (e.g., by
+        a :class:`~simpy.rt.RealtimeEnvironment` or by patching the instance),
+        it is called for every event instead.
+
+        """
+        stop = None
+        if until is not None:
+            if not isinstance(until, Event):
+                until = stop = self._schedule_stop(until)
+            elif until.callbacks is None:
+                # Until event has already been processed.
+                return until.value
+            else:
+                until.callbacks.append(StopSimulation.callback)
+
+        steps = repeat(None) if max_steps is None else repeat(None, max_steps)
+        try:
+            # Check if step() is overridden by a subclass or the instance.
+            # Don't access __dict__, as it slows down attribute lookups.
+            step = self.step
+            if getattr(step, '__func__', None) is not _step:
+                self._run_steps(step, steps, stop)
+            else:
+                event = self._run_inline(steps, stop)
+                if event is not None:
+                    # The event has failed and has not been defused. Crash
+                    # the environment with a copy of its exception.
+                    exc = type(event._value)(*event._value.args)
+                    exc.__cause__ = event._value
+                    raise exc
+        except StopSimulation as exc:
+            return exc.args[0]  # == until.value
+        except EmptySchedule:
+            if until is not None:
+                assert not until.triggered
+                raise RuntimeError('No scheduled events left but "until" '
+                                   'event was not triggered: %s' % until)
+            return None
+
+        # The maximum number of steps has been processed.
+        self._detach(until, stop)
+
+    def _detach(self, until, stop):
+        """Detach the *until* event of :meth:`run()` (and its *stop* event),
+        so that it does not stop a later run."""
+        if stop is not None:
+            self._cancel(stop)
+        elif until is not None and until.callbacks is not None:
+            until.callbacks.remove(StopSimulation.callback)
+
+    def _run_steps(self, step, steps, stop):
+        """Call the overridden *step* method for each of the *steps*. The
+        *stop* event of :meth:`run()` (if any) ends the simulation once it
+        is processed."""
+        if stop is not None:
+            stop.callbacks.append(StopSimulation.callback)
+        try:
+            for _ in steps:
+                step()
+        except StopSimulation:
+            if stop is not None:
+                # The stop event does not count as a processed event.
+                self._processed -= 1
+            raise
+
+    def _schedule_stop(self, until):
+        """Schedule and return the event that stops :meth:`run()` at the time
+        *until*.
+
+        The event is scheduled before all regular timeouts. The simulation
+        stops once it is taken from the queue.
+
+        """
+        if self._resolution is None:
+            at = float(until)
+        else:
+            at = index(until)
+
+        if at <= self._now:
+            raise ValueError('until(=%s) should be > the current '
+                             'simulation time.' % at)
+
+        stop = Event(self)
+        stop._ok = True
+        stop._value = None
+        self.schedule(stop, URGENT, at - self._now)
+        return stop
+
+    def _run_inline(self, steps, stop):  # noqa: C901
+        """Process an event for each of the *steps*. Raise
+        :exc:`StopSimulation` once the *stop* event is taken from the queue
+        and return an event that has failed without being defused, so that
+        :meth:`run()` can crash the simulation. Return ``None`` once all
+        steps have been processed.
+
+        The loop body is inlined from :meth:`_pop_item()` and :meth:`step()`
+        for performance reasons, which makes this method deliberately
+        complex. All attributes used in the loop are cached in local
+        variables.
+
+        """
+        queue = self._queue
+        heap = self._heap
+        urgent = self._urgent
+        normal = self._normal
+        cancelled = self._cancelled
+        processed = 0
+
+        try:
+            for _ in steps:
+                while True:
+                    lane = urgent or normal
+                    if lane:
+                        now = self._now
+                        if len(queue):
+                            head = queue[0] if heap else queue.peek()
+                            if head[0] == now and head[1] <= lane[0][1]:
+                                lane = None
+                        if lane:
+                            now, priority, eid, event = lane.popleft()
+                        elif heap:
+                            now, priority, eid, event = heappop(queue)
+                        else:
+                            now, priority, eid, event = queue.pop()
+                    else:
+                        try:
+                            if heap:
+                                now, priority, eid, event = heappop(queue)
+                            else:
+                                now, priority, eid, event = queue.pop()
+                        except IndexError:
+                            raise EmptySchedule()
+
+                    if not cancelled or event not in cancelled:
+                        break
+                    cancelled.remove(event)
+
+                self._now = now
+                if event is stop:
+                    raise StopSimulation(None)
+                processed += 1
+
+                callbacks, event.callbacks = event.callbacks, None
+                # The tracer is looked up for every event, as it may be set or
+                # reset by a callback.
+                if self._tracer is not None:
+                    self._tracer.record(now, priority, eid, event, callbacks)
+                for callback in callbacks:
+                    callback(event)
+
+                if not event._ok and not hasattr(event, '_defused'):
+                    return event
+        finally:
+            self._processed += processed
+        return None
+
+
+_step = Environment.__dict__['step']  # The plain function of Environment.step
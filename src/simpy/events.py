@@ -9,13 +9,17 @@ used, there are several specialized subclasses of it.
     ~simpy.events.Event
     ~simpy.events.Timeout
     ~simpy.events.Process
+    ~simpy.events.CallbackProcess
     ~simpy.events.AnyOf
     ~simpy.events.AllOf
 
 This module also defines the :exc:`Interrupt` exception.
 
 """
-from simpy._compat import PY2
+from simpy._compat import PY2, HAS_AWAIT
+
+if HAS_AWAIT:
+    from simpy._compat import await_event
 
 if PY2:
     import sys
@@ -59,7 +63,20 @@ class Event(object):
     a :class:`Condition` event is generated that lets you wait for both or one
     of them.
 
+    On Python 3.5 and newer, events are awaitable. A coroutine of an
+    ``async def`` process can wait for an event with ``await event``, which
+    returns the value of the event.
+
+    Events use ``__slots__`` to reduce their memory footprint, so attributes
+    not declared by the event classes cannot be set on their instances. They
+    can still be weakly referenced. Subclasses that do not define
+    ``__slots__`` themselves (or that include ``'__dict__'`` in them) can
+    store arbitrary attributes again.
+
     """
+    __slots__ = ('env', 'callbacks', '_value', '_ok', '_defused',
+                 '__weakref__')
+
     def __init__(self, env):
         self.env = env
         """The :class:`~simpy.core.Environment` the event lives in."""
@@ -189,6 +206,9 @@ class Event(object):
         happened concurrently)."""
         return Condition(self.env, Condition.any_events, [self, other])
 
+    if HAS_AWAIT:
+        __await__ = await_event
+
 
 class Timeout(Event):
     """A :class:`~simpy.events.Event` that gets triggered after a *delay* has
@@ -197,6 +217,8 @@ class Timeout(Event):
     This event is automatically triggered when it is created.
 
     """
+    __slots__ = ('_delay', '_cancelled')
+
     def __init__(self, env, delay, value=None):
         if delay < 0:
             raise ValueError('Negative delay %s' % delay)
@@ -209,6 +231,25 @@ class Timeout(Event):
         self._ok = True
         env.schedule(self, NORMAL, delay)
 
+    def cancel(self):
+        """Cancel the timeout. It will never be processed and its callbacks
+        are not invoked.
+
+        The timeout remains in the event queue until it would have been
+        processed or until the environment purges all cancelled events from
+        the queue.
+
+        Raise a :exc:`RuntimeError` if the timeout has already been processed
+        or cancelled.
+
+        """
+        if self.callbacks is None:
+            raise RuntimeError('%s has already been processed' % self)
+        if hasattr(self, '_cancelled'):
+            raise RuntimeError('%s has already been cancelled' % self)
+        self._cancelled = True
+        self.env._cancel(self)
+
     def _desc(self):
         """Return a string *Timeout(delay[, value=value])*."""
         return '%s(%s%s)' % (self.__class__.__name__, self._delay,
@@ -216,12 +257,93 @@ class Timeout(Event):
                              (', value=%s' % self._value))
 
 
+class Periodic(Event):
+    """An :class:`~simpy.events.Event` that is processed every *interval*
+    until it is stopped.
+
+    The event is triggered with *value* when it is created and is processed
+    for the first time after *interval* has passed. Each time it is processed,
+    it schedules itself again and calls *callback* (if given) with the event
+    as argument. Processes that yield the event are resumed at its next
+    tick.
+
+    Unlike a process sleeping in a ``while True: yield env.timeout(interval)``
+    loop, the same event object and callback lists are reused for every
+    tick.
+
+    Periodic events cannot be used in conditions (like ``periodic | timeout``),
+    because they never stay processed. Creating such a condition raises
+    a :exc:`ValueError`.
+
+    """
+    __slots__ = ('_interval', '_callback', '_current', '_spare', '_stopped')
+
+    def __init__(self, env, interval, callback=None, value=None):
+        if interval <= 0:
+            raise ValueError('interval(=%s) must be > 0.' % interval)
+        # NOTE: The following initialization code is inlined from
+        # Event.__init__() for performance reasons.
+        self.env = env
+        self._value = value
+        self._ok = True
+        self._interval = interval
+        self._callback = callback
+
+        # Two callback lists are used alternately, as the list of the current
+        # tick is still iterated when the event is rescheduled. The first
+        # callback of both lists is _tick().
+        tick = self._tick
+        self.callbacks = self._current = [tick]
+        self._spare = [tick]
+        env.schedule(self, NORMAL, interval)
+
+    def _desc(self):
+        """Return a string *Periodic(interval)*."""
+        return '%s(%s)' % (self.__class__.__name__, self._interval)
+
+    @property
+    def interval(self):
+        """The time between two ticks of the event. A new interval takes
+        effect after the next tick."""
+        return self._interval
+
+    @interval.setter
+    def interval(self, interval):
+        if interval <= 0:
+            raise ValueError('interval(=%s) must be > 0.' % interval)
+        self._interval = interval
+
+    def stop(self):
+        """Stop the event. Its next tick is cancelled and it will never be
+        processed again.
+
+        Raise a :exc:`RuntimeError` if the event has already been stopped.
+
+        """
+        if hasattr(self, '_stopped'):
+            raise RuntimeError('%s has already been stopped' % self)
+        self._stopped = True
+        self.env._cancel(self)
+
+    def _tick(self, event):
+        callbacks = self._spare
+        del callbacks[1:]
+        self._spare = self._current
+        self.callbacks = self._current = callbacks
+        self.env.schedule(self, NORMAL, self._interval)
+
+        if self._callback is not None:
+            self._callback(self)
+
+
 class Initialize(Event):
     """Initializes a process. Only used internally by :class:`Process`.
 
     This event is automatically triggered when it is created.
 
     """
+    __slots__ = ()
+
     def __init__(self, env, process):
         # NOTE: The following initialization code is inlined from
         # Event.__init__() for performance reasons.
@@ -243,6 +365,8 @@ class Interruption(Event):
     This event is automatically triggered when it is created.
 
     """
+    __slots__ = ('process',)
+
     def __init__(self, process, cause):
         # NOTE: The following initialization code is inlined from
         # Event.__init__() for performance reasons.
@@ -284,6 +408,9 @@ class Process(Event):
     with the value of that event once it has happened. The exception of failed
     events is thrown into the generator.
 
+    Instead of a generator, the coroutine of an ``async def`` function can be
+    used, which suspends its execution with ``await event``.
+
     ``Process`` itself is an event, too. It is triggered, once the generator
     returns or raises an exception. The value of the process is the return
     value of the generator or the exception, respectively.
@@ -297,6 +424,8 @@ class Process(Event):
     Processes can be interrupted during their execution by :meth:`interrupt`.
 
     """
+    __slots__ = ('_generator', '_target')
+
     def __init__(self, env, generator):
         if not hasattr(generator, 'throw'):
             # Implementation note: Python implementations differ in the
@@ -308,7 +437,8 @@ class Process(Event):
             # name ``__next__`` cannot be used because it was renamed from
             # ``next`` in Python 2).
             # Remove this workaround if it causes issues in production!
-            raise ValueError('%s is not a generator.' % generator)
+            raise ValueError('%s is not a generator or coroutine.' %
+                             generator)
 
         # NOTE: The following initialization code is inlined from
         # Event.__init__() for performance reasons.
@@ -355,7 +485,11 @@ class Process(Event):
         the process generator exits, the process itself will get triggered with
         the return value or the exception of the generator."""
         # Mark the current process as active.
-        self.env._active_proc = self
+        env = self.env
+        env._active_proc = self
+        profiler = env._profiler
+        if profiler is not None:
+            start = profiler.clock()
 
         while True:
             # Get next event from process
@@ -366,33 +500,19 @@ class Process(Event):
                     # The process has no choice but to handle the failed event
                     # (or fail itself).
                     event._defused = True
-
-                    # Create an exclusive copy of the exception for this
-                    # process to prevent traceback modifications by other
-                    # processes.
-                    exc = type(event._value)(*event._value.args)
-                    exc.__cause__ = event._value
-                    if PY2:
-                        if hasattr(event._value, '__traceback__'):
-                            exc.__traceback__ = event._value.__traceback__
+                    exc = _copy_exception(event._value)
                     event = self._generator.throw(exc)
             except StopIteration as e:
                 # Process has terminated.
                 event = None
                 self._ok = True
                 self._value = e.args[0] if len(e.args) else None
-                self.env.schedule(self)
+                env.schedule(self)
                 break
             except BaseException as e:
                 # Process has failed.
                 event = None
-                self._ok = False
-                tb = e.__traceback__ if not PY2 else sys.exc_info()[2]
-                # Strip the frame of this function from the traceback as it
-                # does not add any useful information.
-                e.__traceback__ = tb.tb_next
-                self._value = e
-                self.env.schedule(self)
+                self._fail(e)
                 break
 
             # Process returned another event to wait upon.
@@ -406,17 +526,186 @@ class Process(Event):
             except AttributeError:
                 # Our optimism didn't work out, figure out what went wrong and
                 # inform the user.
-                if not hasattr(event, 'callbacks'):
-                    msg = 'Invalid yield value "%s"' % event
+                raise self._invalid_yield(event)
+
+        self._target = event
+        env._active_proc = None
+        if profiler is not None:
+            profiler.record(self, profiler.clock() - start)
+
+    def _fail(self, exception):
+        """Fail the process with the *exception* raised by its generator."""
+        self._ok = False
+        tb = exception.__traceback__ if not PY2 else sys.exc_info()[2]
+        # Strip the frame of _resume() from the traceback as it does not add
+        # any useful information.
+        exception.__traceback__ = tb.tb_next
+        self._value = exception
+        self.env.schedule(self)
+
+    def _invalid_yield(self, event):
+        """Return the error for the invalid yield value *event*."""
+        if not hasattr(event, 'callbacks'):
+            msg = 'Invalid yield value "%s"' % event
+
+        frame = getattr(self._generator, 'gi_frame', None)
+        if frame is None:
+            frame = self._generator.cr_frame
+        descr = _describe_frame(frame)
+        error = RuntimeError('\n%s%s' % (descr, msg))
+        # Drop the AttributeError as the cause for this exception.
+        error.__cause__ = None
+        return error
+
+
+class CallbackProcess(Process):
+    """Process driven by the callable *step* instead of a generator.
+
+    *step* is called with an event and returns the next event the process
+    waits for. The first call receives the :class:`Initialize` event of the
+    process. Each following call receives the event returned by the previous
+    call once it has been processed. No generator frame is kept alive between
+    two calls.
 
-                descr = _describe_frame(self._generator.gi_frame)
-                error = RuntimeError('\n%s%s' % (descr, msg))
-                # Drop the AttributeError as the cause for this exception.
-                error.__cause__ = None
-                raise error
+    Instead of passing *step*, subclasses can override :meth:`step()` and keep
+    the state of the process in their own ``__slots__``. This is the most
+    compact way to model a large number of agents:
+
+    .. code-block:: python
+
+        class Walker(CallbackProcess):
+            __slots__ = ('position',)
+
+            def __init__(self, env):
+                self.position = 0
+                super(Walker, self).__init__(env)
+
+            def step(self, event):
+                self.position += 1
+                return self.env.timeout(1)
+
+    Failed events (including the :class:`Interruption` of
+    :meth:`~Process.interrupt()`) are passed to *step* as well. *step* needs
+    to check :attr:`Event.ok` and handle the failure by setting
+    :attr:`Event.defused` to ``True`` or by raising an exception. Like
+    a process generator that does not catch an exception, the process fails
+    with the exception of the event otherwise.
+
+    The process terminates once *step* returns ``None`` or raises
+    :exc:`StopIteration` (e.g. via :meth:`~simpy.core.BaseEnvironment.exit()`),
+    whose argument becomes the value of the process. If *step* raises any
+    other exception, the process fails with it.
+
+    """
+    __slots__ = ()
+
+    def __init__(self, env, step=None):
+        if step is not None and not callable(step):
+            raise ValueError('%s is not callable.' % step)
+
+        # NOTE: The following initialization code is inlined from
+        # Event.__init__() for performance reasons.
+        self.env = env
+        self.callbacks = []
+        self._value = PENDING
+
+        # The generator slot of the process holds the step function.
+        self._generator = step
+        self._target = Initialize(env, self)
+
+    def _desc(self):
+        """Return a string *CallbackProcess(step_func_name)*."""
+        step = self.step if self._generator is None else self._generator
+        return '%s(%s)' % (self.__class__.__name__,
+                           getattr(step, '__name__', step))
+
+    def step(self, event):
+        """Return the next event to wait for after *event* has been processed.
+
+        Calls the *step* function of the process by default.
+
+        """
+        return self._generator(event)
+
+    @property
+    def _resume(self):
+        # The process itself is the callback that resumes it, so that no bound
+        # method needs to be created whenever it waits for an event.
+        return self
+
+    def __call__(self, event):
+        """Call :meth:`step()` with *event* until it returns an event that has
+        not yet been processed. If :meth:`step()` terminates, the process
+        itself will get triggered with its return value or exception."""
+        env = self.env
+        env._active_proc = self
+        profiler = env._profiler
+        if profiler is not None:
+            start = profiler.clock()
+
+        while True:
+            try:
+                if event._ok:
+                    result = self.step(event)
+                else:
+                    result = self._step_failed(event)
+            except BaseException as e:
+                self._stop(event, e)
+                event = None
+                break
+
+            event = result
+            try:
+                if event.callbacks is not None:
+                    event.callbacks.append(self)
+                    break
+            except AttributeError:
+                # step() has returned None or an invalid result.
+                self._exit(event)
+                break
 
         self._target = event
-        self.env._active_proc = None
+        env._active_proc = None
+        if profiler is not None:
+            profiler.record(self, profiler.clock() - start)
+
+    def _step_failed(self, event):
+        """Call :meth:`step()` with the failed *event*. Raise a copy of the
+        exception of *event* if :meth:`step()` does not defuse it."""
+        # The event may have been defused by its creator (like an
+        # Interruption) or by another process.
+        if hasattr(event, '_defused'):
+            del event._defused
+        result = self.step(event)
+        if not hasattr(event, '_defused'):
+            raise _copy_exception(event._value)
+        return result
+
+    def _stop(self, event, exception):
+        """Terminate the process with the *exception* that :meth:`step()`
+        raised for *event*. A failure of *event* counts as handled."""
+        if not event._ok:
+            event._defused = True
+        if isinstance(exception, StopIteration):
+            self._ok = True
+            self._value = exception.args[0] if len(exception.args) else None
+            self.env.schedule(self)
+        else:
+            self._fail(exception)
+
+    def _exit(self, result):
+        """Terminate the process if *result* of :meth:`step()` is ``None``.
+        Raise a :exc:`RuntimeError` for any other result."""
+        if result is not None:
+            error = RuntimeError('Invalid step result "%s" of %s' %
+                                 (result, self))
+            # Drop the AttributeError as the cause for this exception.
+            error.__cause__ = None
+            raise error
+
+        self._ok = True
+        self._value = None
+        self.env.schedule(self)
 
 
 class ConditionValue(object):
@@ -482,6 +771,8 @@ class Condition(Event):
     Condition events can be nested.
 
     """
+    __slots__ = ('_evaluate', '_events', '_count')
+
     def __init__(self, env, evaluate, events):
         super(Condition, self).__init__(env)
         self._evaluate = evaluate
@@ -498,6 +789,10 @@ class Condition(Event):
             if self.env != event.env:
                 raise ValueError('It is not allowed to mix events from '
                                  'different environments')
+            if isinstance(event, Periodic):
+                # A periodic event is pending again right after each tick, so
+                # the condition could never tell that it has occurred.
+                raise ValueError('%s cannot be used in a condition' % event)
 
         # Check if the condition is met for each processed event. Attach
         # _check() as a callback otherwise.
@@ -568,6 +863,8 @@ class AllOf(Condition):
     any of *events* failed.
 
     """
+    __slots__ = ()
+
     def __init__(self, env, events):
         super(AllOf, self).__init__(env, Condition.all_events, events)
 
@@ -578,6 +875,8 @@ class AnyOf(Condition):
     any of *events* failed.
 
     """
+    __slots__ = ()
+
     def __init__(self, env, events):
         super(AnyOf, self).__init__(env, Condition.any_events, events)
 
@@ -602,6 +901,17 @@ class Interrupt(Exception):
         return self.args[0]
 
 
+def _copy_exception(exception):
+    """Return an exclusive copy of *exception* for a process to prevent
+    traceback modifications by other processes."""
+    exc = type(exception)(*exception.args)
+    exc.__cause__ = exception
+    if PY2:
+        if hasattr(exception, '__traceback__'):
+            exc.__traceback__ = exception.__traceback__
+    return exc
+
+
 def _describe_frame(frame):
     """Print filename, line number and function name of a stack frame."""
     filename, name = frame.f_code.co_filename, frame.f_code.co_name
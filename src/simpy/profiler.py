@@ -0,0 +1,100 @@
+"""
+Profiling of the processes of an :class:`~simpy.core.Environment`.
+
+A profiler is assigned to :attr:`Environment.profiler
+<simpy.core.Environment.profiler>`. Whenever the environment resumes
+a :class:`~simpy.events.Process`, the wall-clock time spent in its generator
+(or in the step function of a :class:`~simpy.events.CallbackProcess`) is
+measured and passed to the :meth:`~Profiler.record()` method of the
+profiler. Profiling can be started and stopped at any time, even while the
+simulation is running. If no profiler is set, profiling does not cost
+anything.
+
+.. autosummary::
+
+    ~simpy.profiler.Profiler
+
+"""
+from timeit import default_timer
+
+
+class Profiler(object):
+    """Accumulate the number of resumes and the wall-clock time spent in each
+    process.
+
+    The time is measured with the callable *clock*, which returns the current
+    time in seconds. By default, the most precise clock of the platform is
+    used.
+
+    The profiler keeps a reference to every process it has seen, so that the
+    costs of terminated processes can still be reported. Use :meth:`clear()`
+    to release them.
+
+    """
+    def __init__(self, clock=default_timer):
+        self.clock = clock
+        """Callable returning the current wall-clock time in seconds."""
+
+        self._processes = {}  # Maps processes to [resumes, time].
+
+    @property
+    def resumes(self):
+        """Total number of process resumes recorded."""
+        return sum(stats[0] for stats in self._processes.values())
+
+    @property
+    def time(self):
+        """Total time in seconds spent in the recorded processes."""
+        return sum(stats[1] for stats in self._processes.values())
+
+    def record(self, process, elapsed):
+        """Record that *process* has been resumed and ran for *elapsed*
+        seconds."""
+        stats = self._processes.get(process)
+        if stats is None:
+            self._processes[process] = [1, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    def processes(self):
+        """Return a list of ``(process, resumes, time)`` tuples for all
+        recorded processes, starting with the most expensive one."""
+        stats = [(process, resumes, time)
+                 for process, (resumes, time) in self._processes.items()]
+        stats.sort(key=lambda item: item[2], reverse=True)
+        return stats
+
+    def functions(self):
+        """Return a list of ``(name, processes, resumes, time)`` tuples, which
+        sum up the processes by the name of their generator (or step)
+        function, starting with the most expensive one. The names look like
+        ``Process(name)``."""
+        functions = {}
+        for process, (resumes, time) in self._processes.items():
+            name = process._desc()
+            stats = functions.get(name)
+            if stats is None:
+                functions[name] = [1, resumes, time]
+            else:
+                stats[0] += 1
+                stats[1] += resumes
+                stats[2] += time
+        stats = [(name, count, resumes, time)
+                 for name, (count, resumes, time) in functions.items()]
+        stats.sort(key=lambda item: item[3], reverse=True)
+        return stats
+
+    def report(self, limit=None):
+        """Return a table with the costs of the *limit* most expensive
+        functions (or of all functions if *limit* is ``None``)."""
+        lines = ['%9s %10s %12s %12s  %s' % (
+            'processes', 'resumes', 'time [s]', 'per resume', 'function')]
+        for name, count, resumes, time in self.functions()[:limit]:
+            lines.append('%9d %10d %12.6f %12.9f  %s' % (
+                count, resumes, time, time / resumes, name))
+        return '\n'.join(lines)
+
+    def clear(self):
+        """Remove all recorded costs."""
+        self._processes.clear()
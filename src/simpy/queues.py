@@ -0,0 +1,578 @@
+"""
+Event queues used by :class:`~simpy.core.Environment` to store scheduled
+events.
+
+Scheduled events are stored as ``(time, priority, eid, event)`` tuples. The
+event ID *eid* is unique, so the order of the tuples is fully defined by their
+first three elements and events never need to be compared. An event queue
+always returns the smallest of its tuples first.
+
+SimPy ships the following queue implementations:
+
+.. autosummary::
+
+    ~simpy.queues.HeapQueue
+    ~simpy.queues.CalendarQueue
+    ~simpy.queues.LadderQueue
+    ~simpy.queues.TimingWheel
+
+The queue to be used is passed to the environment, e.g.
+``Environment(queue=CalendarQueue())``. Custom queues need to implement the
+interface of :class:`EventQueue`.
+
+"""
+from __future__ import division
+
+from heapq import heapify, heappush, heappop, nsmallest
+from operator import itemgetter
+
+
+Infinity = float('inf')
+
+
+class EventQueue(object):
+    """Base class for event queues.
+
+    An event queue stores ``(time, priority, eid, event)`` tuples and returns
+    them in ascending order. Implementations may assume that no item is pushed
+    with a *time* smaller than the time of the last item returned by
+    :meth:`pop()`.
+
+    """
+    def __len__(self):
+        """Return the number of items in the queue."""
+        raise NotImplementedError(self)
+
+    def __iter__(self):
+        """Iterate over all items of the queue in arbitrary order."""
+        raise NotImplementedError(self)
+
+    def push(self, item):
+        """Insert *item* into the queue."""
+        raise NotImplementedError(self)
+
+    def pop(self):
+        """Remove and return the smallest item.
+
+        Raise an :exc:`IndexError` if the queue is empty.
+
+        """
+        raise NotImplementedError(self)
+
+    def peek(self):
+        """Return the smallest item without removing it.
+
+        Raise an :exc:`IndexError` if the queue is empty.
+
+        """
+        raise NotImplementedError(self)
+
+    def purge(self, events):
+        """Remove all items whose event is contained in the set *events*."""
+        raise NotImplementedError(self)
+
+
+class HeapQueue(list, EventQueue):
+    """Event queue based on a binary heap (see :mod:`heapq`).
+
+    Insertion and removal of items take *O(log n)* time. This is the default
+    queue of :class:`~simpy.core.Environment`, which directly uses the
+    :mod:`heapq` functions on it for performance reasons.
+
+    """
+    def push(self, item):
+        heappush(self, item)
+
+    def pop(self):
+        return heappop(self)
+
+    def peek(self):
+        return self[0]
+
+    def purge(self, events):
+        self[:] = [item for item in self if item[3] not in events]
+        heapify(self)
+
+
+class CalendarQueue(EventQueue):
+    """Event queue based on a calendar queue (R. Brown, 1988).
+
+    Items are distributed by their time over *buckets* "days" of a fixed
+    *width*. Each day is a small heap, so that items with equal times are still
+    returned in ``(time, priority, eid)`` order. The number of days and their
+    width are adapted to the number of items and their time distribution,
+    which results in an amortized *O(1)* cost for the insertion and removal of
+    items.
+
+    Items that cannot be mapped onto a day (e.g., events scheduled at
+    :data:`~simpy.core.Infinity`) are kept in a separate heap.
+
+    """
+    def __init__(self, width=1.0, buckets=16):
+        if width <= 0:
+            raise ValueError('width(=%s) must be > 0.' % width)
+        if buckets < 1:
+            raise ValueError('buckets(=%s) must be >= 1.' % buckets)
+
+        self._width = width
+        self._min_buckets = buckets
+        self._buckets = [[] for _ in range(buckets)]
+        self._size = 0
+        self._day = 0  # Virtual day of the last item returned.
+        self._far = []  # Items that cannot be mapped onto a day.
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            for item in bucket:
+                yield item
+        for item in self._far:
+            yield item
+
+    def push(self, item):
+        try:
+            day = int(item[0] / self._width)
+        except OverflowError:
+            heappush(self._far, item)
+            self._size += 1
+            return
+
+        buckets = self._buckets
+        nbuckets = len(buckets)
+        heappush(buckets[day % nbuckets], item)
+        if day < self._day:
+            self._day = day
+
+        self._size += 1
+        if self._size > 2 * nbuckets:
+            self._resize(2 * nbuckets)
+
+    def pop(self):
+        item = heappop(self._find())
+        self._size -= 1
+
+        nbuckets = len(self._buckets)
+        if self._size < nbuckets // 2 and nbuckets > self._min_buckets:
+            self._resize(nbuckets // 2)
+
+        return item
+
+    def peek(self):
+        return self._find()[0]
+
+    def purge(self, events):
+        for bucket in self._buckets:
+            bucket[:] = [item for item in bucket if item[3] not in events]
+            heapify(bucket)
+        self._far = [item for item in self._far if item[3] not in events]
+        heapify(self._far)
+        self._size = sum(map(len, self._buckets)) + len(self._far)
+
+        nbuckets = len(self._buckets)
+        if self._size < nbuckets // 2 and nbuckets > self._min_buckets:
+            self._resize(max(self._min_buckets, nbuckets // 2))
+
+    def _find(self):
+        """Return the bucket containing the smallest item and advance the
+        current day to that bucket."""
+        if self._size == len(self._far):
+            if not self._far:
+                raise IndexError('The queue is empty')
+            return self._far
+
+        buckets, width, day = self._buckets, self._width, self._day
+        nbuckets = len(buckets)
+
+        # Search the current year for the next day containing an item.
+        end = day + nbuckets
+        while day < end:
+            bucket = buckets[day % nbuckets]
+            if bucket and int(bucket[0][0] / width) <= day:
+                self._day = day
+                return bucket
+            day += 1
+
+        # There are only items in future years. Search directly for the
+        # bucket containing the smallest item.
+        bucket = min((bucket for bucket in buckets if bucket),
+                     key=itemgetter(0))
+        self._day = int(bucket[0][0] / width)
+        return bucket
+
+    def _resize(self, nbuckets):
+        """Redistribute all items onto *nbuckets* days with a new width."""
+        items = [item for bucket in self._buckets for item in bucket]
+
+        # Estimate the width from the average separation of the items at the
+        # head of the queue. Separations much larger than the average are
+        # ignored.
+        times = [item[0] for item in nsmallest(25, items)]
+        seps = [b - a for a, b in zip(times, times[1:])]
+        if seps:
+            avg = sum(seps) / len(seps)
+            seps = [sep for sep in seps if sep <= 2 * avg]
+            width = 3 * sum(seps) / len(seps)
+            if width > 0:
+                self._width = width
+
+        self._buckets = buckets = [[] for _ in range(nbuckets)]
+        width = self._width
+        for item in items:
+            buckets[int(item[0] / width) % nbuckets].append(item)
+        for bucket in buckets:
+            heapify(bucket)
+
+        self._day = int(min(items)[0] / width) if items else 0
+
+
+class _Rung(object):
+    """A rung of a :class:`LadderQueue` covering *nbuckets* buckets of
+    *width* starting at *start*."""
+    __slots__ = ('start', 'width', 'cur', 'buckets')
+
+    def __init__(self, start, width, nbuckets):
+        self.start = start
+        self.width = width
+        self.cur = 0
+        self.buckets = [[] for _ in range(nbuckets)]
+
+    def index(self, time):
+        """Return the bucket index for *time*."""
+        idx = int((time - self.start) / self.width)
+        if idx < 0:
+            return 0
+        if idx >= len(self.buckets):
+            return len(self.buckets) - 1
+        return idx
+
+
+class LadderQueue(EventQueue):
+    """Event queue based on a ladder queue (W. T. Tang et al., 2005).
+
+    The queue consists of an unsorted *top* list for items in the far future,
+    a ladder of *rungs* with unsorted buckets and a sorted *bottom* from which
+    items are returned. Items are only sorted once they are close to the head
+    of the queue. Buckets with more than *threshold* items are split into
+    a new rung (up to *max_rungs* rungs). Insertion and removal of items take
+    amortized *O(1)* time. Unlike :class:`CalendarQueue`, the ladder queue
+    does not need to be resized.
+
+    """
+    def __init__(self, threshold=50, max_rungs=8):
+        if threshold < 1:
+            raise ValueError('threshold(=%s) must be >= 1.' % threshold)
+        if max_rungs < 1:
+            raise ValueError('max_rungs(=%s) must be >= 1.' % max_rungs)
+
+        self._threshold = threshold
+        self._max_rungs = max_rungs
+        self._size = 0
+
+        # Items with a time larger than the bound are put into the top.
+        self._top = []
+        self._top_bound = -Infinity
+        self._top_min = Infinity
+        self._top_max = -Infinity
+
+        self._rungs = []
+        self._bottom = []  # Heap of the items at the head of the queue.
+        self._far = []  # Heap of the items scheduled at infinity.
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for item in self._bottom:
+            yield item
+        for rung in self._rungs:
+            for bucket in rung.buckets[rung.cur:]:
+                for item in bucket:
+                    yield item
+        for item in self._top:
+            yield item
+        for item in self._far:
+            yield item
+
+    def push(self, item):
+        self._size += 1
+        time = item[0]
+
+        if time > self._top_bound:
+            self._top.append(item)
+            if time < self._top_min:
+                self._top_min = time
+            if time > self._top_max:
+                self._top_max = time
+            return
+
+        for rung in self._rungs:
+            idx = rung.index(time)
+            if idx >= rung.cur:
+                rung.buckets[idx].append(item)
+                return
+
+        heappush(self._bottom, item)
+
+    def pop(self):
+        item = heappop(self._bottom or self._next())
+        self._size -= 1
+        return item
+
+    def peek(self):
+        return (self._bottom or self._next())[0]
+
+    def purge(self, events):
+        size = 0
+        self._bottom = [item for item in self._bottom if item[3] not in events]
+        heapify(self._bottom)
+        size += len(self._bottom)
+        for rung in self._rungs:
+            buckets = rung.buckets
+            for idx in range(rung.cur, len(buckets)):
+                buckets[idx] = [item for item in buckets[idx]
+                                if item[3] not in events]
+                size += len(buckets[idx])
+        self._top = [item for item in self._top if item[3] not in events]
+        size += len(self._top)
+        if not self._top:
+            self._top_min, self._top_max = Infinity, -Infinity
+        self._far = [item for item in self._far if item[3] not in events]
+        heapify(self._far)
+        self._size = size + len(self._far)
+
+    def _next(self):
+        """Refill the bottom from the rungs or the top and return the heap
+        containing the smallest item."""
+        rungs = self._rungs
+        while True:
+            while rungs:
+                rung = rungs[-1]
+                buckets = rung.buckets
+                cur = rung.cur
+                while cur < len(buckets) and not buckets[cur]:
+                    cur += 1
+                if cur == len(buckets):
+                    rungs.pop()
+                    continue
+
+                bucket = buckets[cur]
+                buckets[cur] = None
+                rung.cur = cur + 1
+                small = len(bucket) <= self._threshold
+                deep = len(rungs) >= self._max_rungs
+                if small or deep or not self._spawn(bucket):
+                    heapify(bucket)
+                    self._bottom = bucket
+                    return bucket
+
+            if self._top:
+                if self._transfer():
+                    return self._bottom
+            elif self._far:
+                return self._far
+            else:
+                raise IndexError('The queue is empty')
+
+    def _transfer(self):
+        """Move the items from the top into a new rung. Return ``True`` if
+        they have been moved directly to the bottom."""
+        top, lo, hi = self._top, self._top_min, self._top_max
+        self._top = []
+        self._top_min, self._top_max = Infinity, -Infinity
+
+        if hi == Infinity:
+            for item in top:
+                if item[0] == Infinity:
+                    heappush(self._far, item)
+            top = [item for item in top if item[0] != Infinity]
+            if not top:
+                return False
+            hi = max(item[0] for item in top)
+
+        self._top_bound = hi
+        if len(top) <= self._threshold or not self._spawn(top, lo, hi):
+            heapify(top)
+            self._bottom = top
+            return True
+        return False
+
+    def _spawn(self, items, lo=None, hi=None):
+        """Distribute *items* over a new rung. Return ``False`` if the items
+        cannot be distributed (e.g., because they all have the same time)."""
+        if lo is None:
+            lo = min(item[0] for item in items)
+            hi = max(item[0] for item in items)
+
+        width = (hi - lo) / len(items)
+        if not width > 0:
+            return False
+
+        rung = _Rung(lo, width, len(items) + 1)
+        buckets = rung.buckets
+        for item in items:
+            buckets[rung.index(item[0])].append(item)
+        self._rungs.append(rung)
+        return True
+
+
+class TimingWheel(EventQueue):
+    """Event queue based on a hierarchical timing wheel (G. Varghese and
+    T. Lauck, 1987).
+
+    The time is divided into ticks of *width*. The wheel consists of *levels*
+    rings of *slots* unsorted slots each. A slot of the lowest level covers
+    one tick and a slot of each further level covers all slots of the level
+    below. An item is appended to the slot of the lowest level that can hold
+    it, which takes *O(1)* time. Once the slot of a higher level is reached,
+    its items are redistributed over the lower levels. The items of the
+    current tick are kept in a heap, so that they are still returned in
+    ``(time, priority, eid)`` order.
+
+    Items beyond the *horizon* of the wheel (roughly
+    ``width * slots ** levels`` ahead of the current tick) are kept in
+    a separate heap and moved into the wheel once it reaches them.
+
+    The wheel suits models that schedule many short timeouts, most of which
+    are cancelled (e.g., retransmission timers), as these are inserted in
+    constant time and never sorted. *slots* must be a power of two.
+
+    """
+    def __init__(self, width=1.0, slots=256, levels=4):
+        if width <= 0:
+            raise ValueError('width(=%s) must be > 0.' % width)
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError('slots(=%s) must be a power of two.' % slots)
+        if levels < 1:
+            raise ValueError('levels(=%s) must be >= 1.' % levels)
+
+        self._width = width
+        self._slots = slots
+        self._mask = slots - 1
+        self._bits = slots.bit_length() - 1
+        # Ticks whose bits above the horizon differ are beyond the wheel.
+        self._horizon = self._bits * levels
+        self._wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._counts = [0] * levels  # Number of items per level.
+        self._size = 0
+        self._tick = 0  # The current tick.
+        self._bottom = []  # Heap of the items of the current tick.
+        self._far = []  # Heap of the items beyond the horizon.
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for item in self._bottom:
+            yield item
+        for wheel in self._wheels:
+            for slot in wheel:
+                for item in slot:
+                    yield item
+        for item in self._far:
+            yield item
+
+    def push(self, item):
+        self._size += 1
+        try:
+            tick = int(item[0] // self._width)
+        except (OverflowError, ValueError):
+            # The item is scheduled at infinity.
+            heappush(self._far, item)
+            return
+
+        cur = self._tick
+        if tick <= cur:
+            heappush(self._bottom, item)
+            return
+
+        # The lowest level whose slots cover both, the current tick and the
+        # tick of the item, is determined by their highest differing bit.
+        diff = tick ^ cur
+        if diff < self._slots:
+            self._wheels[0][tick & self._mask].append(item)
+            self._counts[0] += 1
+            return
+        if diff >> self._horizon:
+            heappush(self._far, item)
+            return
+        bits = self._bits
+        level = (diff.bit_length() - 1) // bits
+        self._wheels[level][(tick >> bits * level) & self._mask].append(item)
+        self._counts[level] += 1
+
+    def pop(self):
+        item = heappop(self._bottom or self._next())
+        self._size -= 1
+        return item
+
+    def peek(self):
+        return (self._bottom or self._next())[0]
+
+    def purge(self, events):
+        self._bottom = [item for item in self._bottom if item[3] not in events]
+        heapify(self._bottom)
+        size = len(self._bottom)
+        for level, wheel in enumerate(self._wheels):
+            count = 0
+            for slot in wheel:
+                slot[:] = [item for item in slot if item[3] not in events]
+                count += len(slot)
+            self._counts[level] = count
+            size += count
+        self._far = [item for item in self._far if item[3] not in events]
+        heapify(self._far)
+        self._size = size + len(self._far)
+
+    def _next(self):
+        """Advance the wheel to the next tick with items and return the heap
+        containing the smallest item."""
+        bits, mask = self._bits, self._mask
+        counts, wheels = self._counts, self._wheels
+        while not self._bottom:
+            if not any(counts):
+                far = self._far
+                if not far:
+                    raise IndexError('The queue is empty')
+                if far[0][0] == Infinity:
+                    return far
+
+                # Jump to the first item beyond the horizon and move all
+                # items that are now covered by the wheel into it.
+                cur = self._tick = int(far[0][0] // self._width)
+                horizon = self._horizon
+                while far and far[0][0] != Infinity and not (
+                        int(far[0][0] // self._width) ^ cur) >> horizon:
+                    self._size -= 1
+                    self.push(heappop(far))
+                continue
+
+            # Jump to the next non-empty slot of the lowest non-empty level.
+            # All levels below are empty, so no items are skipped.
+            level = 0
+            while not counts[level]:
+                level += 1
+            wheel = wheels[level]
+            shift = bits * level
+            block = self._tick >> shift
+            idx = (block & mask) + 1
+            while not wheel[idx]:
+                idx += 1
+            self._tick = (block - (block & mask) + idx) << shift
+
+            slot = wheel[idx]
+            wheel[idx] = []
+            counts[level] -= len(slot)
+            if level == 0:
+                # The slot contains the items of the current tick.
+                heapify(slot)
+                self._bottom = slot
+            else:
+                # Redistribute the items over the lower levels.
+                self._size -= len(slot)
+                push = self.push
+                for item in slot:
+                    push(item)
+
+        return self._bottom
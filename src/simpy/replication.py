@@ -0,0 +1,195 @@
+"""
+Independent replications of a simulation model.
+
+:func:`replicate()` runs a model once for each of a number of random seeds.
+Every replication gets a fresh :class:`~simpy.core.Environment` and runs in
+a pool of worker processes, so that the replications of a study run in
+parallel on all cores of a machine.
+
+.. autosummary::
+
+    ~simpy.replication.replicate
+    ~simpy.replication.Replication
+
+"""
+import random
+from collections import deque, namedtuple
+from multiprocessing import cpu_count
+from timeit import default_timer
+
+try:
+    # Python >= 3.3 (or the "futures" backport)
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+except ImportError:
+    ProcessPoolExecutor = None
+
+from simpy.core import Environment
+
+
+_END = object()  # Marks the end of the seeds.
+
+
+class Replication(namedtuple('Replication',
+                             'seed value exception events time')):
+    """Result of a single replication of a model.
+
+    *value* is the return value of the model or ``None`` if it raised the
+    *exception*. *events* is the number of events the environment has
+    processed (cancelled events are not counted) and *time* is the wall-clock
+    time in seconds that the replication took. Both are ``None`` if the
+    replication was lost, e.g., because the worker process running it
+    crashed. *events* is also ``None`` if the environment is not
+    a :class:`~simpy.core.Environment`.
+
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """``True`` if the model returned without raising an exception."""
+        return self.exception is None
+
+
+def replicate(model, seeds, workers=None, environment=Environment):
+    """Run *model* once for each of the *seeds* and return an iterator over
+    the :class:`Replication` results in the order in which they complete.
+
+    For each seed, a new environment is created by calling *environment* and
+    the global :mod:`random` generator is seeded with the seed. Then
+    ``model(env, seed)`` is called. It sets up the model, runs the
+    environment and returns the result of the replication. If the model
+    raises an exception, the result contains the exception instead.
+
+    The replications run in a pool of *workers* processes (one per CPU by
+    default), which requires that *model*, *environment* and the results can
+    be pickled. At most two replications per worker are queued at a time,
+    so *seeds* may also be a long (or infinite) iterator. If a worker
+    crashes, the replications it may have been running are repeated one at
+    a time to find the one that crashed it, whose result contains the
+    :exc:`~concurrent.futures.process.BrokenProcessPool` error.
+
+    With ``workers=1``, all replications run one after another in the
+    current process.
+
+    Raise a :exc:`ValueError` if ``workers < 1`` and a :exc:`RuntimeError`
+    if more than one worker is requested but :mod:`concurrent.futures` is not
+    available.
+
+    """
+    if workers is None:
+        workers = cpu_count()
+    if workers < 1:
+        raise ValueError('workers(=%s) must be >= 1.' % workers)
+    if workers == 1:
+        return (_run(model, seed, environment) for seed in seeds)
+    if ProcessPoolExecutor is None:
+        raise RuntimeError('Parallel replications require concurrent.futures '
+                           '(install the "futures" backport on Python 2).')
+    return _replicate(model, iter(seeds), workers, environment)
+
+
+def _run(model, seed, environment):
+    """Run a single replication of *model* with *seed* in a new environment
+    created by *environment*."""
+    env = environment()
+    random.seed(seed)
+    start = default_timer()
+    try:
+        value, exception = model(env, seed), None
+    except Exception as e:
+        value, exception = None, e
+    time = default_timer() - start
+    events = getattr(env, '_processed', None)
+    return Replication(seed, value, exception, events, time)
+
+
+def _replicate(model, seeds, workers, environment):
+    """Run the replications of *model* for *seeds* in a process pool with
+    *workers* processes."""
+    pool = ProcessPoolExecutor(workers)
+    pending = {}  # Maps the futures of submitted replications to their seeds.
+    suspects = deque()  # Seeds of the replications lost in a crash.
+    isolated = False  # Whether a lost replication is repeated on its own.
+    try:
+        while True:
+            # Replications lost in a crash are repeated one at a time. Others
+            # are only submitted once all of them have been repeated.
+            broken = False
+            if not pending:
+                isolated = bool(suspects)
+                if isolated:
+                    broken = _submit(pool, pending, [suspects.popleft()], 1,
+                                     model, environment, suspects)
+            if not isolated:
+                broken = _submit(pool, pending, seeds, 2 * workers, model,
+                                 environment, suspects)
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                results, crashed = _collect(done, pending, suspects, isolated)
+                for result in results:
+                    yield result
+                broken = broken or crashed
+            elif not broken:
+                return
+
+            if broken:
+                # All other replications of the pool are lost as well.
+                suspects.extend(pending.values())
+                pending.clear()
+                pool.shutdown(wait=True)
+                pool = ProcessPoolExecutor(workers)
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def _submit(pool, pending, seeds, limit, model, environment, suspects):
+    """Submit replications for the next *seeds* to *pool* until *limit*
+    replications are *pending*.
+
+    Return ``True`` if the pool is broken, because a worker has crashed
+    since the last results were collected. The seed that could not be
+    submitted is then added to the *suspects*, like the seeds of the other
+    replications lost in the crash.
+
+    """
+    seeds = iter(seeds)
+    while len(pending) < limit:
+        seed = next(seeds, _END)
+        if seed is _END:
+            break
+        try:
+            pending[pool.submit(_run, model, seed, environment)] = seed
+        except BrokenProcessPool:
+            suspects.append(seed)
+            return True
+    return False
+
+
+def _collect(done, pending, suspects, isolated):
+    """Remove the *done* futures from *pending* and return a list of their
+    results and whether they have been lost in a crash of the pool.
+
+    The seeds of lost replications are added to *suspects*, unless the
+    replication has been *isolated* and must have crashed the pool itself.
+
+    """
+    results, broken = [], False
+    for future in done:
+        seed = pending.pop(future)
+        exception = future.exception()
+        if exception is None:
+            results.append(future.result())
+        elif not isinstance(exception, BrokenProcessPool):
+            # The replication could not be sent to or from the worker.
+            results.append(Replication(seed, None, exception, None, None))
+        elif isolated:
+            # This replication crashed the worker.
+            broken = True
+            results.append(Replication(seed, None, exception, None, None))
+        else:
+            broken = True
+            suspects.append(seed)
+    return results, broken
@@ -3,9 +3,15 @@ Base classes of for Simpy's shared resource types.
 
 :class:`BaseResource` defines the abstract base resource. It supports *get* and
 *put* requests, which return :class:`Put` and :class:`Get` events respectively.
-These events are triggered once the request has been completed.
+These events are triggered once the request has been completed. Pending
+requests wait in a :class:`RequestQueue` by default. Statistics of the usage
+of a resource can be collected in a :class:`ResourceStats` instance.
 
 """
+from __future__ import division
+
+from collections import OrderedDict
+
 from simpy.core import BoundClass
 from simpy.events import Event
 
@@ -31,6 +37,8 @@ class Put(Event):
 
         resource.put_queue.append(self)
         self.callbacks.append(resource._trigger_get)
+        if resource._stats is not None:
+            resource._stats._requested(self)
         resource._trigger_put(None)
 
     def __enter__(self):
@@ -52,6 +60,8 @@ class Put(Event):
         """
         if not self.triggered:
             self.resource.put_queue.remove(self)
+            if self.resource._stats is not None:
+                self.resource._stats._cancelled(self)
 
 
 class Get(Event):
@@ -75,6 +85,8 @@ class Get(Event):
 
         resource.get_queue.append(self)
         self.callbacks.append(resource._trigger_put)
+        if resource._stats is not None:
+            resource._stats._requested(self)
         resource._trigger_get(None)
 
     def __enter__(self):
@@ -96,6 +108,248 @@ class Get(Event):
         """
         if not self.triggered:
             self.resource.get_queue.remove(self)
+            if self.resource._stats is not None:
+                self.resource._stats._cancelled(self)
+
+
+class RequestQueue(object):
+    """First-in first-out queue of request events, which supports removing
+    events in *O(1)* time.
+
+    The events are kept in an :class:`~collections.OrderedDict`. Accessing,
+    appending and removing the first or the last event as well as removing any
+    event takes *O(1)* time. Access to any other index copies the queue into
+    a list and takes *O(n)* time. The default scan of
+    :meth:`BaseResource._trigger_put()` and
+    :meth:`BaseResource._trigger_get()` walks the queue by index, so it is
+    only suited for resources whose :meth:`~BaseResource._do_put()` and
+    :meth:`~BaseResource._do_get()` stop at the first event that cannot be
+    granted. Other resources should keep a :class:`list` or use the
+    candidate hooks of :class:`BaseResource`.
+
+    Besides index access, the queue supports iteration, :func:`len()`,
+    membership tests, :meth:`index()` and :meth:`count()`. It compares equal
+    to a list (or another request queue) with the same events and is printed
+    like a list.
+
+    """
+    __hash__ = None
+
+    def __init__(self):
+        self._events = OrderedDict()
+
+    def __eq__(self, other):
+        if isinstance(other, (list, RequestQueue)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __len__(self):
+        return len(self._events)
+
+    def __contains__(self, event):
+        return event in self._events
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def __repr__(self):
+        return repr(list(self._events))
+
+    def __getitem__(self, idx):
+        try:
+            if idx == 0:
+                return next(iter(self._events))
+            elif idx == -1:
+                return next(reversed(self._events))
+        except StopIteration:
+            raise IndexError('queue index out of range')
+        return list(self._events)[idx]
+
+    def index(self, event):
+        """Return the index of *event* in *O(n)* time.
+
+        Raise a :exc:`ValueError` if *event* is not in the queue.
+
+        """
+        for idx, queued in enumerate(self._events):
+            if queued is event:
+                return idx
+        raise ValueError('%s is not in the queue' % event)
+
+    def count(self, event):
+        """Return the number of occurrences of *event*, which is ``1`` if it
+        is in the queue and ``0`` otherwise."""
+        return 1 if event in self._events else 0
+
+    def append(self, event):
+        """Append *event* to the end of the queue."""
+        self._events[event] = None
+
+    def pop(self, idx=-1):
+        """Remove and return the event at *idx* (the last one by default)."""
+        if idx == 0 or idx == -1:
+            try:
+                return self._events.popitem(last=idx == -1)[0]
+            except KeyError:
+                raise IndexError('pop from empty queue')
+        event = self[idx]
+        del self._events[event]
+        return event
+
+    def remove(self, event):
+        """Remove *event* from the queue.
+
+        Raise a :exc:`ValueError` if *event* is not in the queue.
+
+        """
+        try:
+            del self._events[event]
+        except KeyError:
+            raise ValueError('%s is not in the queue' % event)
+
+
+class ResourceStats(object):
+    """Statistics of the usage of a *resource* since their creation by
+    :meth:`BaseResource.collect_stats()`.
+
+    The time-weighted averages of the amount of the resource in use or stored
+    (the number of users of a :class:`~simpy.resources.resource.Resource`, the
+    level of a :class:`~simpy.resources.container.Container` or the number of
+    items in a :class:`~simpy.resources.store.Store`) and of the lengths of
+    its put and get queues are updated incrementally whenever a request is
+    made, granted or cancelled. Likewise, the waiting times of requests made
+    since the creation of the statistics are summed up once the requests are
+    granted. Each update takes *O(1)* time and all values can be read at any
+    time.
+
+    """
+    def __init__(self, resource):
+        self._resource = resource
+        self._env = resource._env
+
+        self.start = self._env.now
+        """The time at which the collection of the statistics started."""
+
+        self.puts = 0
+        """Number of granted put requests."""
+        self.put_wait = 0
+        """Total waiting time of the granted put requests."""
+        self.put_wait_max = 0
+        """Maximum waiting time of a granted put request."""
+        self.gets = 0
+        """Number of granted get requests."""
+        self.get_wait = 0
+        """Total waiting time of the granted get requests."""
+        self.get_wait_max = 0
+        """Maximum waiting time of a granted get request."""
+
+        # The current values, the time of their last change and their
+        # integrals over time.
+        self._last = self.start
+        self._amount = resource._amount()
+        self._put_len = len(resource.put_queue)
+        self._get_len = len(resource.get_queue)
+        self._amount_area = 0
+        self._put_area = 0
+        self._get_area = 0
+
+        # Creation times of the pending requests.
+        self._pending = {}
+
+    @property
+    def amount(self):
+        """Time-weighted average of the amount of the resource in use or
+        stored."""
+        return self._mean(self._amount_area, self._amount)
+
+    @property
+    def put_queue(self):
+        """Time-weighted average length of the put queue."""
+        return self._mean(self._put_area, self._put_len)
+
+    @property
+    def get_queue(self):
+        """Time-weighted average length of the get queue."""
+        return self._mean(self._get_area, self._get_len)
+
+    @property
+    def mean_put_wait(self):
+        """Average waiting time of the granted put requests."""
+        return self.put_wait / self.puts if self.puts else 0
+
+    @property
+    def mean_get_wait(self):
+        """Average waiting time of the granted get requests."""
+        return self.get_wait / self.gets if self.gets else 0
+
+    def _mean(self, area, value):
+        """Return the time-weighted average for the integral *area* up to
+        the last change and the current *value*."""
+        now = self._env.now
+        if now == self.start:
+            return value
+        return (area + value * (now - self._last)) / (now - self.start)
+
+    def _update(self):
+        """Integrate the values up to now and take their new values."""
+        now = self._env.now
+        elapsed = now - self._last
+        if elapsed:
+            self._amount_area += self._amount * elapsed
+            self._put_area += self._put_len * elapsed
+            self._get_area += self._get_len * elapsed
+            self._last = now
+        resource = self._resource
+        self._amount = resource._amount()
+        self._put_len = len(resource.put_queue)
+        self._get_len = len(resource.get_queue)
+
+    def _requested(self, event):
+        """Note the creation of the request *event*."""
+        self._pending[event] = self._env.now
+
+    def _put_granted(self, event):
+        """Add the waiting time of the granted put request *event*."""
+        time = self._pending.pop(event, None)
+        if time is not None:
+            wait = self._env.now - time
+            self.puts += 1
+            self.put_wait += wait
+            if wait > self.put_wait_max:
+                self.put_wait_max = wait
+
+    def _get_granted(self, event):
+        """Add the waiting time of the granted get request *event*."""
+        time = self._pending.pop(event, None)
+        if time is not None:
+            wait = self._env.now - time
+            self.gets += 1
+            self.get_wait += wait
+            if wait > self.get_wait_max:
+                self.get_wait_max = wait
+
+    def _cancelled(self, event):
+        """Forget the cancelled request *event*."""
+        self._pending.pop(event, None)
+        self._update()
+
+
+def _trigger_candidates(queue, candidates, do, granted):
+    """Call *do* for each of the *candidates* until it returns ``False`` and
+    remove the triggered events from *queue*. *granted* (if not ``None``) is
+    called with each triggered event."""
+    for event in candidates:
+        proceed = do(event)
+        if event.triggered:
+            queue.remove(event)
+            if granted is not None:
+                granted(event)
+        if not proceed:
+            break
 
 
 class BaseResource(object):
@@ -112,21 +366,28 @@ class BaseResource(object):
 
     - providing custom :attr:`PutQueue` and :attr:`GetQueue` types,
     - providing custom :class:`Put` respectively :class:`Get` events,
-    - and implementing the request processing behaviour through the methods
-      ``_do_get()`` and ``_do_put()``.
+    - implementing the request processing behaviour through the methods
+      ``_do_get()`` and ``_do_put()``,
+    - declaring which requests may have become satisfiable after another
+      request has been processed through the methods ``_get_candidates()`` and
+      ``_put_candidates()``,
+    - and defining the amount of the resource that is in use or stored through
+      the method ``_amount()``, which is needed by :meth:`collect_stats()`.
 
     """
     PutQueue = list
     """The type to be used for the :attr:`put_queue`. It is a plain
     :class:`list` by default. The type must support index access (e.g.
-    ``__getitem__()`` and ``__len__()``) as well as provide ``append()`` and
-    ``pop()`` operations."""
+    ``__getitem__()`` and ``__len__()``) as well as provide ``append()``,
+    ``pop()`` and ``remove()`` operations. The built-in resources use
+    a :class:`RequestQueue`."""
 
     GetQueue = list
     """The type to be used for the :attr:`get_queue`. It is a plain
     :class:`list` by default. The type must support index access (e.g.
-    ``__getitem__()`` and ``__len__()``) as well as provide ``append()`` and
-    ``pop()`` operations."""
+    ``__getitem__()`` and ``__len__()``) as well as provide ``append()``,
+    ``pop()`` and ``remove()`` operations. The built-in resources use
+    a :class:`RequestQueue`."""
 
     def __init__(self, env, capacity):
         self._env = env
@@ -135,6 +396,7 @@ class BaseResource(object):
         """Queue of pending *put* requests."""
         self.get_queue = self.GetQueue()
         """Queue of pending *get* requests."""
+        self._stats = None
 
         # Bind event constructors as methods
         BoundClass.bind_early(self)
@@ -144,6 +406,27 @@ class BaseResource(object):
         """Maximum capacity of the resource."""
         return self._capacity
 
+    @property
+    def stats(self):
+        """The :class:`ResourceStats` of the resource or ``None`` if no
+        statistics are collected (see :meth:`collect_stats()`)."""
+        return self._stats
+
+    def collect_stats(self):
+        """Start to collect statistics of the resource and return the new
+        :class:`ResourceStats` instance. Statistics collected so far are
+        discarded."""
+        self._stats = ResourceStats(self)
+        return self._stats
+
+    def _amount(self):
+        """Return the amount of the resource that is in use or stored.
+
+        This method needs to be implemented by subclasses that support
+        :meth:`collect_stats()`.
+        """
+        raise NotImplementedError(self)
+
     put = BoundClass(Put)
     """Request to put something into the resource and return a :class:`Put`
     event, which gets triggered once the request succeeds."""
@@ -165,30 +448,58 @@ class BaseResource(object):
         """
         raise NotImplementedError(self)
 
+    def _put_candidates(self, get_event):
+        """Return the put events which may have become satisfiable.
+
+        This method is called by :meth:`_trigger_put` with the processed
+        *get_event* (or ``None`` if a new put event has been created).
+        Subclasses can override it to only return the put events affected by
+        *get_event*, so that the cost of :meth:`_trigger_put` is proportional
+        to the number of requests actually granted. The default implementation
+        returns the :attr:`put_queue` itself.
+
+        Any other return value is iterated lazily. Triggered events are removed
+        from the :attr:`put_queue` before the next candidate is requested.
+        """
+        return self.put_queue
+
     def _trigger_put(self, get_event):
         """This method is called once a new put event has been created or a get
         event has been processed.
 
-        The method iterates over all put events in the :attr:`put_queue` and
-        calls :meth:`_do_put` to check if the conditions for the event are met.
-        If :meth:`_do_put` returns ``False``, the iteration is stopped early.
+        The method iterates over the put events returned by
+        :meth:`_put_candidates` (by default all put events in the
+        :attr:`put_queue`) and calls :meth:`_do_put` to check if the conditions
+        for the event are met. If :meth:`_do_put` returns ``False``, the
+        iteration is stopped early.
         """
-
-        # Maintain queue invariant: All put requests must be untriggered.
-        # This code is not very pythonic because the queue interface should be
-        # simple (only append(), pop(), __getitem__() and __len__() are
-        # required).
-        idx = 0
-        while idx < len(self.put_queue):
-            put_event = self.put_queue[idx]
-            proceed = self._do_put(put_event)
-            if not put_event.triggered:
-                idx += 1
-            elif self.put_queue.pop(idx) != put_event:
-                raise RuntimeError('Put queue invariant violated')
-
-            if not proceed:
-                break
+        stats = self._stats
+        candidates = self._put_candidates(get_event)
+        if candidates is not self.put_queue:
+            _trigger_candidates(
+                self.put_queue, candidates, self._do_put,
+                None if stats is None else stats._put_granted)
+        else:
+            # Maintain queue invariant: All put requests must be untriggered.
+            # This code is not very pythonic because the queue interface
+            # should be simple (only append(), pop(), __getitem__() and
+            # __len__() are required).
+            idx = 0
+            while idx < len(self.put_queue):
+                put_event = self.put_queue[idx]
+                proceed = self._do_put(put_event)
+                if not put_event.triggered:
+                    idx += 1
+                elif self.put_queue.pop(idx) != put_event:
+                    raise RuntimeError('Put queue invariant violated')
+                elif stats is not None:
+                    stats._put_granted(put_event)
+
+                if not proceed:
+                    break
+
+        if stats is not None:
+            stats._update()
 
     def _do_get(self, event):
         """Perform the *get* operation.
@@ -203,29 +514,57 @@ class BaseResource(object):
         """
         raise NotImplementedError(self)
 
+    def _get_candidates(self, put_event):
+        """Return the get events which may have become satisfiable.
+
+        This method is called by :meth:`_trigger_get` with the processed
+        *put_event* (or ``None`` if a new get event has been created).
+        Subclasses can override it to only return the get events affected by
+        *put_event*, so that the cost of :meth:`_trigger_get` is proportional
+        to the number of requests actually granted. The default implementation
+        returns the :attr:`get_queue` itself.
+
+        Any other return value is iterated lazily. Triggered events are removed
+        from the :attr:`get_queue` before the next candidate is requested.
+        """
+        return self.get_queue
+
     def _trigger_get(self, put_event):
         """Trigger get events.
 
         This method is called once a new get event has been created or a put
         event has been processed.
 
-        The method iterates over all get events in the :attr:`get_queue` and
-        calls :meth:`_do_get` to check if the conditions for the event are met.
-        If :meth:`_do_get` returns ``False``, the iteration is stopped early.
+        The method iterates over the get events returned by
+        :meth:`_get_candidates` (by default all get events in the
+        :attr:`get_queue`) and calls :meth:`_do_get` to check if the conditions
+        for the event are met. If :meth:`_do_get` returns ``False``, the
+        iteration is stopped early.
         """
-
-        # Maintain queue invariant: All get requests must be untriggered.
-        # This code is not very pythonic because the queue interface should be
-        # simple (only append(), pop(), __getitem__() and __len__() are
-        # required).
-        idx = 0
-        while idx < len(self.get_queue):
-            get_event = self.get_queue[idx]
-            proceed = self._do_get(get_event)
-            if not get_event.triggered:
-                idx += 1
-            elif self.get_queue.pop(idx) != get_event:
-                raise RuntimeError('Get queue invariant violated')
-
-            if not proceed:
-                break
+        stats = self._stats
+        candidates = self._get_candidates(put_event)
+        if candidates is not self.get_queue:
+            _trigger_candidates(
+                self.get_queue, candidates, self._do_get,
+                None if stats is None else stats._get_granted)
+        else:
+            # Maintain queue invariant: All get requests must be untriggered.
+            # This code is not very pythonic because the queue interface
+            # should be simple (only append(), pop(), __getitem__() and
+            # __len__() are required).
+            idx = 0
+            while idx < len(self.get_queue):
+                get_event = self.get_queue[idx]
+                proceed = self._do_get(get_event)
+                if not get_event.triggered:
+                    idx += 1
+                elif self.get_queue.pop(idx) != get_event:
+                    raise RuntimeError('Get queue invariant violated')
+                elif stats is not None:
+                    stats._get_granted(get_event)
+
+                if not proceed:
+                    break
+
+        if stats is not None:
+            stats._update()
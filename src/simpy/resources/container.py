@@ -6,9 +6,19 @@ A :class:`Container` can be used to model the fuel tank of a gasoline station.
 Tankers increase and refuelled cars decrease the amount of gas in the station's
 fuel tanks.
 
+By default, get requests are served in first-in first-out order. The *policy*
+of a container can also serve the smallest requests first or the largest
+requests that fit the current level.
+
 """
+from operator import attrgetter
+
 from simpy.core import BoundClass
 from simpy.resources import base
+from simpy.resources.resource import SortedQueue
+
+POLICIES = ('fifo', 'smallest', 'best-fit')
+"""Policies by which a :class:`Container` serves its get requests."""
 
 
 class ContainerPut(base.Put):
@@ -55,33 +65,66 @@ class Container(base.BaseResource):
     is of unlimited size. The initial amount of matter is specified by *init*
     and defaults to ``0``.
 
-    Raise a :exc:`ValueError` if ``capacity <= 0``, ``init < 0`` or
-    ``init > capacity``.
+    The *policy* defines the order in which get requests are served:
+
+    - ``'fifo'`` (the default) serves them in the order they were made. A
+      request waits until all earlier requests have been served.
+    - ``'smallest'`` serves the requests with the smallest amount first.
+    - ``'best-fit'`` serves the request with the largest amount that does not
+      exceed the level of the container.
+
+    Requests for equal amounts are served in the order they were made. With
+    the last two policies, the waiting get requests are kept sorted by their
+    amount. Serving *k* of *n* waiting requests then takes *O(k log n)* time.
+
+    Raise a :exc:`ValueError` if ``capacity <= 0``, ``init < 0``,
+    ``init > capacity`` or if *policy* is unknown.
 
     """
-    def __init__(self, env, capacity=float('inf'), init=0):
+    PutQueue = base.RequestQueue
+    """Type of the put queue. See
+    :attr:`~simpy.resources.base.BaseResource.put_queue` for details."""
+    GetQueue = base.RequestQueue
+    """Type of the get queue. See
+    :attr:`~simpy.resources.base.BaseResource.get_queue` for details."""
+
+    def __init__(self, env, capacity=float('inf'), init=0, policy='fifo'):
         if capacity <= 0:
             raise ValueError('"capacity" must be > 0.')
         if init < 0:
             raise ValueError('"init" must be >= 0.')
         if init > capacity:
             raise ValueError('"init" must be <= "capacity".')
+        if policy not in POLICIES:
+            raise ValueError('"policy" must be one of %s.' %
+                             ', '.join(POLICIES))
 
         super(Container, self).__init__(env, capacity)
 
         self._level = init
+        self._policy = policy
+        if policy != 'fifo':
+            self.get_queue = SortedQueue(key=attrgetter('amount'))
 
     @property
     def level(self):
         """The current amount of the matter in the container."""
         return self._level
 
+    @property
+    def policy(self):
+        """The policy by which get requests are served."""
+        return self._policy
+
     put = BoundClass(ContainerPut)
     """Request to put *amount* of matter into the container."""
 
     get = BoundClass(ContainerGet)
     """Request to get *amount* of matter out of the container."""
 
+    def _amount(self):
+        return self._level
+
     def _do_put(self, event):
         if self._capacity - self._level >= event.amount:
             self._level += event.amount
@@ -93,3 +136,23 @@ class Container(base.BaseResource):
             self._level -= event.amount
             event.succeed()
             return True
+
+    def _get_candidates(self, put_event):
+        if self._policy == 'fifo':
+            return self.get_queue
+        return self._sorted_candidates()
+
+    def _sorted_candidates(self):
+        # The get queue is sorted by amount. Granted requests are removed from
+        # it before the next candidate is requested.
+        queue = self.get_queue
+        if self._policy == 'smallest':
+            while queue and queue[0].amount <= self._level:
+                yield queue[0]
+        else:
+            while queue:
+                idx = queue.bisect(self._level)
+                if idx == 0:
+                    break
+                # Serve the earliest request for the largest fitting amount.
+                yield queue[queue.bisect_left(queue[idx - 1].amount)]
@@ -28,6 +28,10 @@ processes can define a request priority, and a :class:`PreemptiveResource`
 whose resource users can be preempted by requests with a higher priority.
 
 """
+from bisect import bisect_left, bisect_right
+from itertools import count
+from operator import attrgetter
+
 from simpy.core import BoundClass
 from simpy.resources import base
 
@@ -110,14 +114,27 @@ class PriorityRequest(Request):
 
 class SortedQueue(list):
     """Queue for sorting events by their :attr:`~PriorityRequest.key`
-    attribute.
+    attribute or, if given, by the result of the function *key*.
+
+    Events with equal keys remain in the order in which they were appended.
+    The position of an event is determined by a binary search, so appending
+    and removing events takes *O(log n)* comparisons.
 
     """
-    def __init__(self, maxlen=None):
+    def __init__(self, maxlen=None, key=None):
         super(SortedQueue, self).__init__()
         self.maxlen = maxlen
         """Maximum length of the queue."""
 
+        self._key = attrgetter('key') if key is None else key
+
+        # Sort keys of the events in the queue. The sort key of an event is
+        # its key and a sequence number, which keeps events with equal keys in
+        # insertion order.
+        self._keys = []
+        self._sort_keys = {}
+        self._seq = count()
+
     def append(self, item):
         """Sort *item* into the queue.
 
@@ -127,8 +144,42 @@ class SortedQueue(list):
         if self.maxlen is not None and len(self) >= self.maxlen:
             raise RuntimeError('Cannot append event. Queue is full.')
 
-        super(SortedQueue, self).append(item)
-        super(SortedQueue, self).sort(key=lambda e: e.key)
+        sort_key = (self._key(item), next(self._seq))
+        idx = bisect_right(self._keys, sort_key)
+        self._keys.insert(idx, sort_key)
+        self._sort_keys[item] = sort_key
+        super(SortedQueue, self).insert(idx, item)
+
+    def bisect(self, key):
+        """Return the number of items whose key is less than or equal to
+        *key*, which is the index of the first item with a greater key."""
+        return bisect_left(self._keys, (key, float('inf')))
+
+    def bisect_left(self, key):
+        """Return the number of items whose key is less than *key*, which is
+        the index of the first item with an equal or greater key."""
+        return bisect_left(self._keys, (key,))
+
+    def pop(self, idx=-1):
+        """Remove and return the item at *idx* (the last one by default)."""
+        item = super(SortedQueue, self).pop(idx)
+        del self._keys[idx]
+        del self._sort_keys[item]
+        return item
+
+    def remove(self, item):
+        """Remove *item* from the queue.
+
+        Raise a :exc:`ValueError` if *item* is not in the queue.
+
+        """
+        try:
+            sort_key = self._sort_keys.pop(item)
+        except KeyError:
+            raise ValueError('%s is not in the queue' % item)
+        idx = bisect_left(self._keys, sort_key)
+        del self._keys[idx]
+        super(SortedQueue, self).__delitem__(idx)
 
 
 class Resource(base.BaseResource):
@@ -142,15 +193,24 @@ class Resource(base.BaseResource):
     resource is bound to.
 
     """
+    PutQueue = base.RequestQueue
+    """Type of the put queue. See
+    :attr:`~simpy.resources.base.BaseResource.put_queue` for details."""
+    GetQueue = base.RequestQueue
+    """Type of the get queue. See
+    :attr:`~simpy.resources.base.BaseResource.get_queue` for details."""
+
     def __init__(self, env, capacity=1):
         if capacity <= 0:
             raise ValueError('"capacity" must be > 0.')
 
         super(Resource, self).__init__(env, capacity)
 
-        self.users = []
-        """List of :class:`Request` events for the processes that are currently
-        using the resource."""
+        self.users = base.RequestQueue()
+        """:class:`Request` events for the processes that are currently using
+        the resource in the order they were granted. The
+        :class:`~simpy.resources.base.RequestQueue` can be read like a list and
+        removes released requests in *O(1)* time."""
         self.queue = self.put_queue
         """Queue of pending :class:`Request` events. Alias of
         :attr:`~simpy.resources.base.BaseResource.put_queue`.
@@ -167,6 +227,9 @@ class Resource(base.BaseResource):
     release = BoundClass(Release)
     """Release a usage slot."""
 
+    def _amount(self):
+        return len(self.users)
+
     def _do_put(self, event):
         if len(self.users) < self.capacity:
             self.users.append(event)
@@ -213,14 +276,32 @@ class PreemptiveResource(PriorityResource):
     cause.
 
     """
+    def __init__(self, env, capacity=1):
+        super(PreemptiveResource, self).__init__(env, capacity)
+
+        # The users sorted by their key. The last one is the first candidate
+        # for preemption.
+        self._preemptable = SortedQueue()
+
     def _do_put(self, event):
         if len(self.users) >= self.capacity and event.preempt:
             # Check if we can preempt another process
-            preempt = sorted(self.users, key=lambda e: e.key)[-1]
+            preempt = self._preemptable[-1]
             if preempt.key > event.key:
+                self._preemptable.pop()
                 self.users.remove(preempt)
                 preempt.proc.interrupt(Preempted(by=event.proc,
                                                  usage_since=preempt.time,
                                                  resource=self))
 
-        return super(PreemptiveResource, self)._do_put(event)
+        proceed = super(PreemptiveResource, self)._do_put(event)
+        if event.triggered:
+            self._preemptable.append(event)
+        return proceed
+
+    def _do_get(self, event):
+        try:
+            self._preemptable.remove(event.request)
+        except ValueError:
+            pass
+        return super(PreemptiveResource, self)._do_get(event)
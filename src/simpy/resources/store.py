@@ -5,11 +5,12 @@ requests for specific objects.
 The :class:`Store` operates in a FIFO (first-in, first-out) order. Objects are
 retrieved from the store in the order they were put in. The *get* requests of a
 :class:`FilterStore` can be customized by a filter to only retrieve objects
-matching a given criterion.
+matching a given criterion. The *get* requests of a :class:`KeyedStore` ask for
+an object with a given key, which is looked up in a dictionary.
 
 """
-from heapq import heappush, heappop
-from collections import namedtuple
+from heapq import heapify, heappush, heappop
+from collections import deque, namedtuple
 
 from simpy.core import BoundClass
 from simpy.resources import base
@@ -26,6 +27,23 @@ class StorePut(base.Put):
         super(StorePut, self).__init__(store)
 
 
+class StorePutMany(base.Put):
+    """Request to put all *items* into the *store* at once. The request is
+    triggered once there is space for all of the items in the store.
+
+    Raise a :exc:`ValueError` if there are more *items* than the capacity of
+    the *store*.
+
+    """
+    def __init__(self, store, items):
+        self.items = list(items)
+        """The items to put into the store."""
+        if len(self.items) > store.capacity:
+            raise ValueError('len(items)(=%s) must be <= capacity.' %
+                             len(self.items))
+        super(StorePutMany, self).__init__(store)
+
+
 class StoreGet(base.Get):
     """Request to get an *item* from the *store*. The request is triggered
     once there is an item available in the store.
@@ -34,6 +52,25 @@ class StoreGet(base.Get):
     pass
 
 
+class StoreGetMany(base.Get):
+    """Request to get *n* items from the *store* at once. The request is
+    triggered with a list of the items once there are *n* items available in
+    the store.
+
+    Raise a :exc:`ValueError` if ``n <= 0`` or if *n* exceeds the capacity of
+    the *store*.
+
+    """
+    def __init__(self, store, n):
+        if n <= 0:
+            raise ValueError('n(=%s) must be > 0.' % n)
+        if n > store.capacity:
+            raise ValueError('n(=%s) must be <= capacity.' % n)
+        self.n = n
+        """The number of items to get from the store."""
+        super(StoreGetMany, self).__init__(store)
+
+
 class FilterStoreGet(StoreGet):
     """Request to get an *item* from the *store* matching the *filter*. The
     request is triggered once there is such an item available in the store.
@@ -43,6 +80,11 @@ class FilterStoreGet(StoreGet):
     for all items, which makes the request to behave exactly like
     :class:`StoreGet`.
 
+    The filter must be a pure function of the item. Its result must not
+    depend on any other state (like the current simulation time), because
+    a waiting request is only checked against new items, not against the
+    items already in the store.
+
     """
     def __init__(self, resource, filter=lambda item: True):
         self.filter = filter
@@ -50,6 +92,98 @@ class FilterStoreGet(StoreGet):
         super(FilterStoreGet, self).__init__(resource)
 
 
+class KeyedStoreGet(StoreGet):
+    """Request to get an *item* with the given *key* from the *store*. The
+    request is triggered once such an item is available in the store.
+
+    """
+    def __init__(self, resource, key):
+        self.key = key
+        """The key of the requested item."""
+        super(KeyedStoreGet, self).__init__(resource)
+
+
+class KeyedGetQueue(object):
+    """Queue of the pending :class:`KeyedStoreGet` requests of a
+    :class:`KeyedStore`.
+
+    The requests are grouped by their key in :attr:`waiters`. Each group keeps
+    its requests in first-in first-out order.
+
+    """
+    def __init__(self):
+        self.waiters = {}
+        """Dictionary mapping keys to a deque of the requests for them."""
+        self.keys = set()
+        """Keys of the requests appended since the store last checked them."""
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for waiters in self.waiters.values():
+            for event in waiters:
+                yield event
+
+    def append(self, event):
+        """Append the request *event* to the group of its key."""
+        waiters = self.waiters.get(event.key)
+        if waiters is None:
+            waiters = self.waiters[event.key] = deque()
+        waiters.append(event)
+        self.keys.add(event.key)
+        self._len += 1
+
+    def remove(self, event):
+        """Remove the request *event*. Raise a :exc:`ValueError` if it is not
+        in the queue."""
+        waiters = self.waiters.get(event.key)
+        if waiters is None:
+            raise ValueError('%s is not in the queue' % event)
+        waiters.remove(event)
+        if not waiters:
+            del self.waiters[event.key]
+        self._len -= 1
+
+
+class ItemDeque(deque):
+    """Deque of the items of a :class:`Store`.
+
+    Items are appended and removed at both ends in constant time. For
+    compatibility with the list the store used to keep its items in, an item
+    deque compares equal to a list with the same items, returns a list if it
+    is sliced and can :meth:`pop()` an item at any index. Slicing and popping
+    items other than the first or last one take linear time.
+
+    """
+    __hash__ = None
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            return list(self) == other
+        return deque.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return deque.__getitem__(self, index)
+
+    def pop(self, index=-1):
+        """Remove and return the item at *index* (the last one by
+        default)."""
+        if index == -1:
+            return deque.pop(self)
+        if index == 0:
+            return self.popleft()
+        item = self[index]
+        del self[index]
+        return item
+
+
 class Store(base.BaseResource):
     """Resource with *capacity* slots for storing arbitrary objects. By
     default, the *capacity* is unlimited and objects are put and retrieved from
@@ -59,6 +193,13 @@ class Store(base.BaseResource):
     container is bound to.
 
     """
+    PutQueue = base.RequestQueue
+    """Type of the put queue. See
+    :attr:`~simpy.resources.base.BaseResource.put_queue` for details."""
+    GetQueue = base.RequestQueue
+    """Type of the get queue. See
+    :attr:`~simpy.resources.base.BaseResource.get_queue` for details."""
+
     def __init__(self, env, capacity=float('inf')):
         if capacity <= 0:
             raise ValueError('"capacity" must be > 0.')
@@ -66,7 +207,17 @@ class Store(base.BaseResource):
         super(Store, self).__init__(env, capacity)
 
         self.items = []
-        """List of the items available in the store."""
+
+    @property
+    def items(self):
+        """:class:`ItemDeque` of the items available in the store. Any
+        iterable assigned to this attribute is converted into an item
+        deque."""
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        self._items = ItemDeque(items)
 
     put = BoundClass(StorePut)
     """Request to put *item* into the store."""
@@ -74,14 +225,51 @@ class Store(base.BaseResource):
     get = BoundClass(StoreGet)
     """Request to get an *item* out of the store."""
 
+    put_many = BoundClass(StorePutMany)
+    """Request to put all *items* into the store at once."""
+
+    get_many = BoundClass(StoreGetMany)
+    """Request to get *n* items out of the store at once."""
+
+    def _amount(self):
+        return len(self._items)
+
+    def _put_candidates(self, get_event):
+        # Only a bulk get may make room for more than one waiting put request.
+        # Otherwise, only the first one is checked.
+        if isinstance(get_event, StoreGetMany):
+            return self.put_queue
+        return (self.put_queue[0],) if self.put_queue else ()
+
+    def _get_candidates(self, put_event):
+        # Only a bulk put may provide items for more than one waiting get
+        # request. Otherwise, only the first one is checked.
+        if isinstance(put_event, StorePutMany):
+            return self.get_queue
+        return (self.get_queue[0],) if self.get_queue else ()
+
     def _do_put(self, event):
-        if len(self.items) < self._capacity:
-            self.items.append(event.item)
+        # Successful requests return True, so that all requests that a bulk
+        # request may have made satisfiable are checked.
+        if isinstance(event, StorePutMany):
+            if self._capacity - len(self._items) >= len(event.items):
+                self._items.extend(event.items)
+                event.succeed()
+                return True
+        elif len(self._items) < self._capacity:
+            self._items.append(event.item)
             event.succeed()
+            return True
 
     def _do_get(self, event):
-        if self.items:
-            event.succeed(self.items.pop(0))
+        if isinstance(event, StoreGetMany):
+            if len(self._items) >= event.n:
+                popleft = self._items.popleft
+                event.succeed([popleft() for _ in range(event.n)])
+                return True
+        elif self._items:
+            event.succeed(self._items.popleft())
+            return True
 
 
 class PriorityItem(namedtuple('PriorityItem', 'priority item')):
@@ -109,15 +297,38 @@ class PriorityStore(Store):
     items with *PriorityStore*, use :class:`PriorityItem`.
 
     """
+    @property
+    def items(self):
+        """Heap of the items available in the store. Any iterable assigned to
+        this attribute is converted into a heap."""
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        self._items = list(items)
+        heapify(self._items)
 
     def _do_put(self, event):
-        if len(self.items) < self._capacity:
-            heappush(self.items, event.item)
+        if isinstance(event, StorePutMany):
+            if self._capacity - len(self._items) >= len(event.items):
+                for item in event.items:
+                    heappush(self._items, item)
+                event.succeed()
+                return True
+        elif len(self._items) < self._capacity:
+            heappush(self._items, event.item)
             event.succeed()
+            return True
 
     def _do_get(self, event):
-        if self.items:
-            event.succeed(heappop(self.items))
+        if isinstance(event, StoreGetMany):
+            if len(self._items) >= event.n:
+                items = self._items
+                event.succeed([heappop(items) for _ in range(event.n)])
+                return True
+        elif self._items:
+            event.succeed(heappop(self._items))
+            return True
 
 
 class FilterStore(Store):
@@ -127,7 +338,10 @@ class FilterStore(Store):
     first-out order.
 
     Get requests can be customized with a filter function to only trigger for
-    items for which said filter function returns ``True``.
+    items for which said filter function returns ``True``. A new get request
+    checks all items in the store, while a waiting one is only checked
+    against the items put into the store afterwards. Filters must therefore
+    be pure functions of the item (see :class:`FilterStoreGet`).
 
     .. note::
 
@@ -142,6 +356,14 @@ class FilterStore(Store):
 
     """
 
+    def __init__(self, env, capacity=float('inf')):
+        # Items of granted put requests that have not been offered to the
+        # waiting get requests yet.
+        self._unchecked = []
+        # Maps get requests to the new item they have been matched with.
+        self._matches = {}
+        super(FilterStore, self).__init__(env, capacity)
+
     put = BoundClass(StorePut)
     """Request a to put *item* into the store."""
 
@@ -149,10 +371,161 @@ class FilterStore(Store):
     """Request a to get an *item*, for which *filter* returns ``True``, out of
     the store."""
 
+    def _do_put(self, event):
+        granted = super(FilterStore, self)._do_put(event)
+        if granted:
+            if isinstance(event, StorePutMany):
+                self._unchecked.extend(event.items)
+            else:
+                self._unchecked.append(event.item)
+        return granted
+
     def _do_get(self, event):
-        for item in self.items:
+        if event in self._matches:
+            item = self._matches.pop(event)
+            try:
+                self._items.remove(item)
+                event.succeed(item)
+                return True
+            except ValueError:
+                # The item has been removed from the store by other means.
+                pass
+
+        for item in self._items:
             if event.filter(item):
-                self.items.remove(item)
+                self._items.remove(item)
                 event.succeed(item)
                 break
         return True
+
+    def get_many(self, n):
+        """Bulk get requests are not supported by a filter store. Raise
+        a :exc:`TypeError`."""
+        raise TypeError('%s does not support get_many().' %
+                        self.__class__.__name__)
+
+    def _get_candidates(self, put_event):
+        # Waiting get events match none of the items in the store, except for
+        # the items of the put events granted since they were last checked.
+        # These items are matched with the waiting get events in queue order
+        # before a new get event (if any) checks all items.
+        queue = self.get_queue
+        new = queue[-1] if put_event is None else None
+        candidates = []
+        items = self._unchecked
+        if items:
+            self._unchecked = []
+            for get_event in queue:
+                if get_event is new:
+                    break
+                for idx, item in enumerate(items):
+                    if get_event.filter(item):
+                        self._matches[get_event] = items.pop(idx)
+                        candidates.append(get_event)
+                        break
+                if not items:
+                    break
+        if new is not None:
+            candidates.append(new)
+        return candidates
+
+
+class KeyedStore(Store):
+    """Resource with *capacity* slots for storing arbitrary objects, which can
+    be retrieved by their key. Like the :class:`Store`, the *capacity* is
+    unlimited by default.
+
+    The key of an item is computed by the function *key*, which receives the
+    item. By default, the item itself is its key. Get requests specify the
+    key of the item they want. Items with the same key are retrieved in
+    first-in first-out order, as are get requests for the same key.
+
+    In contrast to a :class:`FilterStore`, items and waiting get requests are
+    indexed by their key. A get request is therefore matched by a dictionary
+    lookup and a new item only wakes up the get requests for its key.
+
+    """
+    GetQueue = KeyedGetQueue
+
+    def __init__(self, env, capacity=float('inf'), key=None):
+        self._key = (lambda item: item) if key is None else key
+        # The items are kept in a dictionary mapping keys to a deque of the
+        # items with that key. *_level* is the total number of items.
+        self._index = {}
+        self._level = 0
+        super(KeyedStore, self).__init__(env, capacity)
+
+    @property
+    def items(self):
+        """List of the items available in the store, grouped by key. Any
+        iterable assigned to this attribute replaces the items of the
+        store."""
+        return [item for items in self._index.values() for item in items]
+
+    @items.setter
+    def items(self, items):
+        self._index = {}
+        self._level = 0
+        for item in items:
+            self._add(item)
+
+    put = BoundClass(StorePut)
+    """Request to put *item* into the store."""
+
+    get = BoundClass(KeyedStoreGet)
+    """Request to get an *item* with the given *key* out of the store."""
+
+    def _add(self, item):
+        key = self._key(item)
+        items = self._index.get(key)
+        if items is None:
+            items = self._index[key] = deque()
+        items.append(item)
+        self._level += 1
+
+    def get_many(self, n):
+        """Bulk get requests are not supported by a keyed store. Raise
+        a :exc:`TypeError`."""
+        raise TypeError('%s does not support get_many().' %
+                        self.__class__.__name__)
+
+    def _amount(self):
+        return self._level
+
+    def _do_put(self, event):
+        if isinstance(event, StorePutMany):
+            if self._capacity - self._level >= len(event.items):
+                for item in event.items:
+                    self._add(item)
+                event.succeed()
+                return True
+        elif self._level < self._capacity:
+            self._add(event.item)
+            event.succeed()
+            return True
+
+    def _do_get(self, event):
+        items = self._index.get(event.key)
+        if items:
+            event.succeed(items.popleft())
+            if not items:
+                del self._index[event.key]
+            self._level -= 1
+        return True
+
+    def _get_candidates(self, put_event):
+        # A processed put event only affects the get events for the key of its
+        # item. A new get event is the only one for its key that may be
+        # satisfiable.
+        if put_event is None:
+            keys = self.get_queue.keys
+            self.get_queue.keys = set()
+        elif isinstance(put_event, StorePutMany):
+            keys = set(self._key(item) for item in put_event.items)
+        else:
+            keys = (self._key(put_event.item),)
+
+        waiters = self.get_queue.waiters
+        for key in keys:
+            while key in waiters and key in self._index:
+                yield waiters[key][0]
@@ -24,9 +24,11 @@ class RealtimeEnvironment(Environment):
     took too long to compute. This behaviour can be disabled by setting
     *strict* to ``False``.
 
+    The event *queue* can be chosen like for :class:`~simpy.core.Environment`.
+
     """
-    def __init__(self, initial_time=0, factor=1.0, strict=True):
-        Environment.__init__(self, initial_time)
+    def __init__(self, initial_time=0, factor=1.0, strict=True, queue=None):
+        Environment.__init__(self, initial_time, queue)
 
         self.env_start = initial_time
         self.real_start = time()
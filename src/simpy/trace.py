@@ -0,0 +1,334 @@
+"""
+Tracing of the events processed by an :class:`~simpy.core.Environment`.
+
+A tracer is assigned to :attr:`Environment.tracer
+<simpy.core.Environment.tracer>`. The environment then calls its
+:meth:`~TraceBuffer.record()` method for every event it processes, just
+before the callbacks of the event are invoked. Tracing can be started and
+stopped at any time, even while the simulation is running. If no tracer is
+set, tracing does not cost anything.
+
+A :class:`TraceBuffer` keeps the most recent events in memory, while
+a :class:`TraceWriter` streams all of them into a binary file, which can be
+analyzed with a :class:`TraceReader`.
+
+.. autosummary::
+
+    ~simpy.trace.TraceBuffer
+    ~simpy.trace.TraceWriter
+    ~simpy.trace.TraceReader
+
+"""
+import json
+import mmap
+import os
+import struct
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from simpy._compat import PY2
+from simpy.events import Process
+
+
+# Type code of the integer columns. Python 2 lacks "long long" arrays.
+INT = 'l' if PY2 else 'q'
+
+
+def waiting_process(callbacks):
+    """Return the first :class:`~simpy.events.Process` that is resumed by one
+    of the *callbacks* or ``None`` if there is no such process."""
+    for callback in callbacks:
+        process = getattr(callback, '__self__', callback)
+        if isinstance(process, Process):
+            return process
+    return None
+
+
+class TraceBuffer(object):
+    """Ring buffer for the last *capacity* events processed by an environment.
+
+    For each event, the time, priority and ID of the event, its type and the
+    first process waiting for it (if any) are recorded. The numeric columns
+    are preallocated :mod:`array` instances, so recording an event does not
+    allocate any memory. Times are stored as floats. Once the buffer is full,
+    the oldest records are overwritten.
+
+    """
+    def __init__(self, capacity=65536):
+        if capacity < 1:
+            raise ValueError('capacity(=%s) must be >= 1.' % capacity)
+        self.capacity = capacity
+        """Maximum number of records kept in the buffer."""
+
+        self.count = 0
+        """Total number of events recorded, including overwritten ones."""
+
+        self.kinds = []
+        """Event types recorded so far. The kind column refers to them by
+        their index."""
+
+        self._kind_ids = {}
+        self._next = 0  # Index of the next record.
+        self._time = array('d', [0.0]) * capacity
+        self._priority = array(INT, [0]) * capacity
+        self._eid = array(INT, [0]) * capacity
+        self._kind = array(INT, [0]) * capacity
+        self._process = [None] * capacity
+
+    def __len__(self):
+        """Return the number of records in the buffer."""
+        return min(self.count, self.capacity)
+
+    def record(self, time, priority, eid, event, callbacks):
+        """Record the processing of *event* at *time*. *callbacks* are the
+        callbacks of the event that are about to be invoked."""
+        idx = self._next
+        self._time[idx] = time
+        self._priority[idx] = priority
+        self._eid[idx] = eid
+
+        cls = type(event)
+        kind = self._kind_ids.get(cls)
+        if kind is None:
+            kind = self._kind_ids[cls] = len(self.kinds)
+            self.kinds.append(cls)
+        self._kind[idx] = kind
+        self._process[idx] = waiting_process(callbacks)
+
+        idx += 1
+        self._next = 0 if idx == self.capacity else idx
+        self.count += 1
+
+    def records(self):
+        """Return a list of ``(time, priority, eid, event type, process)``
+        tuples for all records in the buffer, starting with the oldest
+        one."""
+        start = self._next if self.count > self.capacity else 0
+        order = list(range(start, len(self))) + list(range(start))
+        kinds = self.kinds
+        return [(self._time[i], self._priority[i], self._eid[i],
+                 kinds[self._kind[i]], self._process[i]) for i in order]
+
+    def clear(self):
+        """Remove all records from the buffer."""
+        self.count = 0
+        self._next = 0
+        self._process[:] = [None] * self.capacity
+
+
+# A trace file starts with a header, which is followed by fixed-size records
+# and a trailer with the names of the event types and processes. All values
+# are little-endian.
+MAGIC = b'SIMPYTRC'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQ')
+"""Magic, version, record size, number of records and trailer offset."""
+RECORD = struct.Struct('<dqiiq')
+"""Time, event ID, priority, event kind and process ID of a record."""
+RECORD_DTYPE = [('time', '<f8'), ('eid', '<i8'), ('priority', '<i4'),
+                ('kind', '<i4'), ('process', '<i8')]
+"""NumPy dtype of a record."""
+
+
+class TraceWriter(object):
+    """Tracer that streams the events processed by an environment into the
+    binary trace file at *path*.
+
+    Each event is packed into a fixed-size record of its time, ID, priority,
+    kind (its type) and the ID of the first process waiting for it (``-1``
+    if there is none). Records are collected in a buffer of *chunk* records
+    that is written to the file once it is full. The names of the event
+    types and processes are written when the writer is closed. Use
+    :class:`TraceReader` to read the file.
+
+    The writer can be used as a context manager, which closes it on exit.
+
+    """
+    def __init__(self, path, chunk=65536):
+        if chunk < 1:
+            raise ValueError('chunk(=%s) must be >= 1.' % chunk)
+        self.count = 0
+        """Number of events recorded so far."""
+
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 0))
+        self._file.flush()
+        self._chunk = bytearray(chunk * RECORD.size)
+        self._offset = 0
+        self._kinds = {}
+        self._processes = {}
+        self._process_names = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, time, priority, eid, event, callbacks):
+        """Write a record for *event* and its *callbacks*."""
+        cls = type(event)
+        kind = self._kinds.get(cls)
+        if kind is None:
+            kind = self._kinds[cls] = len(self._kinds)
+
+        process = waiting_process(callbacks)
+        if process is None:
+            pid = -1
+        else:
+            pid = self._processes.get(process)
+            if pid is None:
+                pid = self._processes[process] = len(self._process_names)
+                self._process_names.append(process._desc())
+        if isinstance(event, Process):
+            # The process has terminated and will not be seen again.
+            self._processes.pop(event, None)
+
+        RECORD.pack_into(self._chunk, self._offset, time, eid, priority, kind,
+                         pid)
+        self._offset += RECORD.size
+        if self._offset == len(self._chunk):
+            # Flush the chunk, so that a reader can access it even if the
+            # writer is never closed.
+            self._file.write(self._chunk)
+            self._file.flush()
+            self._offset = 0
+        self.count += 1
+
+    def close(self):
+        """Flush the buffered records, write the trailer and close the
+        file."""
+        if self._file.closed:
+            return
+        self._file.write(self._chunk[:self._offset])
+        self._offset = 0
+
+        kinds = sorted(self._kinds, key=self._kinds.get)
+        trailer = json.dumps({
+            'kinds': ['%s.%s' % (cls.__module__, cls.__name__)
+                      for cls in kinds],
+            'processes': self._process_names,
+        })
+        offset = self._file.tell()
+        self._file.write(trailer.encode('utf-8'))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.count,
+                                     offset))
+        self._file.close()
+        self._processes.clear()
+
+
+class TraceReader(object):
+    """Reader for a trace file written by a :class:`TraceWriter`.
+
+    The file is memory-mapped and its columns are exposed as arrays. If NumPy
+    is available, the columns are views into the mapped file, so even huge
+    traces are never loaded into memory as a whole. Otherwise, they are
+    :mod:`array` copies.
+
+    If the writer has not been closed (e.g., because the simulation
+    crashed), all complete records can still be read, but the names of the
+    event kinds and processes are not available.
+
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, count, offset = HEADER.unpack_from(
+            self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self._map.close()
+            raise ValueError('%s is not a trace file of version %s' %
+                             (path, VERSION))
+
+        if offset:
+            trailer = json.loads(self._map[offset:].decode('utf-8'))
+        else:
+            count = (size - HEADER.size) // RECORD.size
+            trailer = {'kinds': [], 'processes': []}
+
+        self.kinds = trailer['kinds']
+        """Names of the event types. The kind column refers to them by their
+        index."""
+
+        self.process_names = trailer['processes']
+        """Names of the processes. The process column refers to them by their
+        index."""
+
+        self._count = count
+        self._records = None
+        if numpy is not None:
+            self._records = numpy.frombuffer(self._map, RECORD_DTYPE, count,
+                                             HEADER.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        """Return the number of records."""
+        return self._count
+
+    def __iter__(self):
+        """Iterate over all records as ``(time, eid, priority, kind,
+        process)`` tuples."""
+        data, unpack = self._map, RECORD.unpack_from
+        end = HEADER.size + RECORD.size * self._count
+        for offset in range(HEADER.size, end, RECORD.size):
+            yield unpack(data, offset)
+
+    @property
+    def records(self):
+        """All records as a NumPy structured array, which is a view into the
+        file. Raise a :exc:`RuntimeError` if NumPy is not available."""
+        if self._records is None:
+            raise RuntimeError('NumPy is required for structured records')
+        return self._records
+
+    @property
+    def time(self):
+        """Column with the times of the events."""
+        return self._column('time', 'd')
+
+    @property
+    def eid(self):
+        """Column with the IDs of the events."""
+        return self._column('eid', INT)
+
+    @property
+    def priority(self):
+        """Column with the priorities of the events."""
+        return self._column('priority', INT)
+
+    @property
+    def kind(self):
+        """Column with the kinds of the events (see :attr:`kinds`)."""
+        return self._column('kind', INT)
+
+    @property
+    def process(self):
+        """Column with the IDs of the processes waiting for the events (see
+        :attr:`process_names`) or ``-1``."""
+        return self._column('process', INT)
+
+    def close(self):
+        """Close the memory map of the file. This is only possible once no
+        NumPy columns reference the file anymore."""
+        self._records = None
+        self._map.close()
+
+    def _column(self, name, typecode):
+        """Return the column *name* as a NumPy view or as an array of
+        *typecode*."""
+        if self._records is not None:
+            return self._records[name]
+        idx = [field for field, _ in RECORD_DTYPE].index(name)
+        return array(typecode, (record[idx] for record in self))
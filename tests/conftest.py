@@ -1,8 +1,16 @@
+import sys
+
 import pytest
 
 import simpy
 
 
+# Tests using "async def" can't be compiled by older Python versions.
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_async.py')
+
+
 @pytest.fixture
 def log():
     return []
@@ -0,0 +1,141 @@
+"""
+Tests for processes based on ``async def`` coroutines.
+
+"""
+# Pytest gets the parameters "env" and "log" from the *conftest.py* file
+import pytest
+
+import simpy
+from simpy import Interrupt
+
+
+def test_await_timeout(env, log):
+    """A coroutine is resumed with the value of the awaited event."""
+    async def pem(env, log):
+        for i in range(3):
+            value = await env.timeout(1, value=i)
+            log.append((env.now, value))
+
+    env.process(pem(env, log))
+    env.run()
+    assert log == [(1, 0), (2, 1), (3, 2)]
+
+
+def test_await_process(env):
+    """Coroutine and generator processes can wait for each other."""
+    async def child(env):
+        await env.timeout(1)
+        return 'spam'
+
+    def parent(env):
+        result = yield env.process(child(env))
+        return result
+
+    async def grandparent(env):
+        return await env.process(parent(env))
+
+    proc = env.process(grandparent(env))
+    env.run()
+    assert proc.value == 'spam'
+    assert env.now == 1
+
+
+def test_await_condition(env):
+    async def pem(env):
+        t1, t2 = env.timeout(1, 'a'), env.timeout(2, 'b')
+        result = await (t1 | t2)
+        assert list(result.values()) == ['a']
+        result = await (t1 & t2)
+        assert list(result.values()) == ['a', 'b']
+        return env.now
+
+    proc = env.process(pem(env))
+    env.run()
+    assert proc.value == 2
+
+
+def test_await_failed_event(env):
+    """The exception of a failed event is raised by await."""
+    async def pem(env):
+        event = env.event()
+        event.fail(ValueError('onoes'))
+        try:
+            await event
+        except ValueError as e:
+            return e.args[0]
+
+    proc = env.process(pem(env))
+    env.run()
+    assert proc.value == 'onoes'
+
+
+def test_interrupt_coroutine(env, log):
+    async def victim(env, log):
+        try:
+            await env.timeout(10)
+        except Interrupt as interrupt:
+            log.append((env.now, interrupt.cause))
+
+    async def attacker(env, victim):
+        await env.timeout(1)
+        victim.interrupt('spam')
+
+    proc = env.process(victim(env, log))
+    env.process(attacker(env, proc))
+    env.run()
+    assert log == [(1, 'spam')]
+
+
+def test_await_resource(env, log):
+    """Resource requests can be awaited inside a with statement."""
+    resource = simpy.Resource(env, capacity=1)
+
+    async def user(env, name, log):
+        with resource.request() as req:
+            await req
+            log.append((name, env.now))
+            await env.timeout(1)
+
+    for name in range(2):
+        env.process(user(env, name, log))
+    env.run()
+    assert log == [(0, 0), (1, 1)]
+
+
+def test_invalid_await(env):
+    """Awaiting a foreign awaitable is reported like an invalid yield."""
+    class Foreign(object):
+        def __await__(self):
+            yield 'spam'
+
+    async def pem(env):
+        await Foreign()
+
+    env.process(pem(env))
+    with pytest.raises(RuntimeError) as excinfo:
+        env.run()
+    assert 'Invalid yield value "spam"' in str(excinfo.value)
+
+
+@pytest.mark.benchmark(group='frequent')
+@pytest.mark.parametrize('kind', ['generator', 'coroutine'])
+def test_resume_cost(benchmark, kind):
+    """Compare resuming generator and coroutine processes."""
+    def gen_pem(env):
+        for _ in range(10000):
+            yield env.timeout(1)
+
+    async def coro_pem(env):
+        for _ in range(10000):
+            await env.timeout(1)
+
+    pem = gen_pem if kind == 'generator' else coro_pem
+
+    def sim():
+        env = simpy.Environment()
+        for _ in range(10):
+            env.process(pem(env))
+        env.run()
+        return env.now
+
+    assert benchmark(sim) == 10000
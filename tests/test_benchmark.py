@@ -1,17 +1,21 @@
 """
 Performance benchmark tests using the `pytest-benchmark` package.
 
-Benchmarks are divided into three groups: *frequent*, *targeted*, and
-*simulation*. The *frequent* group benchmarks various simpy functions expected
+Benchmarks are divided into four groups: *frequent*, *targeted*, *simulation*
+and *queue*. The *frequent* group benchmarks various simpy functions expected
 to be called frequently in normal simulations. The *targeted* group benchmarks
 singular behaviors run by the environment. The *simulation* group benchmarks
-complete simulations using processes and resources.
+complete simulations using processes and resources. The *queue* group compares
+the event queue implementations.
 
 """
 import random
 
 import pytest
 import simpy
+from simpy.profiler import Profiler
+from simpy.queues import CalendarQueue, HeapQueue, LadderQueue, TimingWheel
+from simpy.trace import TraceBuffer, TraceWriter
 
 
 @pytest.mark.benchmark(group='frequent')
@@ -89,6 +93,145 @@ def test_wait_for_proc(env, benchmark):
     benchmark(sim, env)
 
 
+@pytest.mark.benchmark(group='targeted')
+@pytest.mark.parametrize('loop', ['run', 'step'])
+def test_run_loop(benchmark, loop):
+    """Compare the inlined loop of run() with calling step() for every
+    event."""
+    def pem(env):
+        while True:
+            yield env.timeout(1)
+
+    def sim():
+        env = simpy.Environment()
+        for _ in range(10):
+            env.process(pem(env))
+        if loop == 'step':
+            # Any override of step() disables the inlined loop.
+            env.step = env.step
+        env.run(until=1000)
+
+    benchmark(sim)
+
+
+@pytest.mark.benchmark(group='targeted')
+@pytest.mark.parametrize('kind', ['generator', 'periodic'])
+def test_periodic_timer(benchmark, kind):
+    """Compare a process sleeping in a loop with a periodic event."""
+    def sample(log):
+        log.append(len(log))
+
+    def pem(env, log):
+        while True:
+            yield env.timeout(1)
+            sample(log)
+
+    def sim():
+        env = simpy.Environment()
+        log = []
+        for _ in range(10):
+            if kind == 'generator':
+                env.process(pem(env, log))
+            else:
+                env.every(1, lambda event: sample(log))
+        env.run(until=1000.5)
+        return len(log)
+
+    assert benchmark(sim) == 10000
+
+
+@pytest.mark.benchmark(group='targeted')
+@pytest.mark.parametrize('tracer', [None, 'buffer', 'file'])
+def test_tracing(benchmark, tmpdir, tracer):
+    """Overhead of recording every event in a trace buffer or file."""
+    def pem(env):
+        while True:
+            yield env.timeout(1)
+
+    def sim():
+        env = simpy.Environment()
+        if tracer == 'buffer':
+            env.tracer = TraceBuffer(1000)
+        elif tracer == 'file':
+            env.tracer = TraceWriter(str(tmpdir.join('sim.trace')))
+        for _ in range(10):
+            env.process(pem(env))
+        env.run(until=1000)
+        if tracer == 'file':
+            env.tracer.close()
+
+    benchmark(sim)
+
+
+@pytest.mark.benchmark(group='targeted')
+@pytest.mark.parametrize('profiler', [None, Profiler])
+def test_profiling(benchmark, profiler):
+    """Overhead of measuring the time spent in each resumed process."""
+    def pem(env):
+        while True:
+            yield env.timeout(1)
+
+    def sim():
+        env = simpy.Environment()
+        if profiler is not None:
+            env.profiler = profiler()
+        for _ in range(10):
+            env.process(pem(env))
+        env.run(until=1000)
+
+    benchmark(sim)
+
+
+def replication_model(env, seed):
+    """Model for test_replications(), which needs to be picklable."""
+    def pem(env):
+        while True:
+            yield env.timeout(random.randint(1, 10))
+
+    for _ in range(10):
+        env.process(pem(env))
+    env.run(until=1000)
+    return env.now
+
+
+@pytest.mark.benchmark(group='simulation')
+@pytest.mark.parametrize('workers', [1, 4])
+def test_replications(benchmark, workers):
+    """Independent replications of a model, in-process or in a pool."""
+    def sim():
+        return len(list(simpy.replicate(replication_model, range(16),
+                                        workers=workers)))
+
+    assert benchmark(sim) == 16
+
+
+@pytest.mark.benchmark(group='simulation')
+@pytest.mark.parametrize('kind', ['generator', 'callback'])
+def test_agents_sim(benchmark, kind):
+    """Many agents, each waiting for a timeout at a time."""
+    def agent(env):
+        while True:
+            yield env.timeout(1)
+
+    class Agent(simpy.CallbackProcess):
+        __slots__ = ()
+
+        def step(self, event):
+            return self.env.timeout(1)
+
+    def sim():
+        env = simpy.Environment()
+        for _ in range(10000):
+            if kind == 'generator':
+                env.process(agent(env))
+            else:
+                Agent(env)
+        env.run(until=10)
+        return env.now
+
+    assert benchmark(sim) == 10
+
+
 @pytest.mark.benchmark(group='simulation')
 def test_store_sim(benchmark):
     def producer(env, store, n):
@@ -115,6 +258,109 @@ def test_store_sim(benchmark):
     assert num_events == 87
 
 
+@pytest.mark.benchmark(group='simulation')
+@pytest.mark.parametrize('buffered', [1000, 100000])
+def test_store_buffer(benchmark, buffered):
+    """Drain a store holding a large number of buffered items."""
+    def consumer(env, store):
+        while True:
+            yield store.get()
+
+    def sim():
+        env = simpy.Environment()
+        store = simpy.Store(env)
+        store.items = range(buffered)
+        env.process(consumer(env, store))
+        env.run()
+        return len(store.items)
+
+    assert benchmark(sim) == 0
+
+
+@pytest.mark.benchmark(group='simulation')
+def test_filter_store_sim(benchmark):
+    """Many pickers waiting for items matching random filters."""
+    def picker(env, store, r):
+        while True:
+            wanted = r.randrange(500)
+            yield store.get(lambda item: item == wanted)
+
+    def supplier(env, store, r):
+        for _ in range(2000):
+            yield env.timeout(1)
+            yield store.put(r.randrange(500))
+
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment()
+        store = simpy.FilterStore(env)
+        for _ in range(200):
+            env.process(picker(env, store, r))
+        env.process(supplier(env, store, r))
+        env.run()
+        return env.now
+
+    assert benchmark(sim) == 2000
+
+
+@pytest.mark.benchmark(group='simulation')
+@pytest.mark.parametrize('bulk', [False, True])
+def test_store_pallets(benchmark, bulk):
+    """Move pallets of 1000 items through a store."""
+    def producer(env, store):
+        for pallet in range(100):
+            items = range(pallet * 1000, (pallet + 1) * 1000)
+            if bulk:
+                yield store.put_many(items)
+            else:
+                for item in items:
+                    yield store.put(item)
+            yield env.timeout(1)
+
+    def consumer(env, store):
+        while True:
+            if bulk:
+                yield store.get_many(1000)
+            else:
+                for _ in range(1000):
+                    yield store.get()
+
+    def sim():
+        env = simpy.Environment()
+        store = simpy.Store(env, capacity=2000)
+        env.process(producer(env, store))
+        env.process(consumer(env, store))
+        env.run()
+        return env.now
+
+    assert benchmark(sim) == 100
+
+
+@pytest.mark.benchmark(group='simulation')
+def test_keyed_store_sim(benchmark):
+    """Many pickers waiting for items with random keys."""
+    def picker(env, store, r):
+        while True:
+            yield store.get(r.randrange(1000))
+
+    def supplier(env, store, r):
+        for _ in range(10000):
+            yield env.timeout(1)
+            yield store.put(r.randrange(1000))
+
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment()
+        store = simpy.KeyedStore(env)
+        for _ in range(1000):
+            env.process(picker(env, store, r))
+        env.process(supplier(env, store, r))
+        env.run()
+        return env.now
+
+    assert benchmark(sim) == 10000
+
+
 @pytest.mark.benchmark(group='simulation')
 def test_resource_sim(benchmark):
     def worker(env, resource):
@@ -135,6 +381,139 @@ def test_resource_sim(benchmark):
     assert num_events == 94
 
 
+@pytest.mark.benchmark(group='simulation')
+@pytest.mark.parametrize('monitor', [None, 'patched', 'stats'])
+def test_resource_monitoring_sim(benchmark, monitor):
+    """Compare the built-in resource statistics with patching the resource
+    as shown in the monitoring guide."""
+    def worker(env, resource):
+        while True:
+            with resource.request() as req:
+                yield req
+                yield env.timeout(1)
+
+    def patch(env, resource, data):
+        def wrap(func):
+            def wrapper(*args, **kwargs):
+                ret = func(*args, **kwargs)
+                data.append((env.now, resource.count, len(resource.queue)))
+                return ret
+            return wrapper
+
+        resource.request = wrap(resource.request)
+        resource.release = wrap(resource.release)
+
+    def sim():
+        env = simpy.Environment()
+        resource = simpy.Resource(env, capacity=2)
+        if monitor == 'patched':
+            patch(env, resource, [])
+        elif monitor == 'stats':
+            resource.collect_stats()
+        for _ in range(50):
+            env.process(worker(env, resource))
+        env.run(until=1000)
+
+    benchmark(sim)
+
+
+@pytest.mark.benchmark(group='simulation')
+def test_large_pool_sim(benchmark):
+    """Users of a pool with a large capacity release it in random order."""
+    def user(env, pool, duration):
+        with pool.request() as req:
+            yield req
+            yield env.timeout(duration)
+
+    def source(env, pool, r):
+        for _ in range(20000):
+            env.process(user(env, pool, r.uniform(1, 20)))
+            yield env.timeout(0.001)
+
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment()
+        pool = simpy.Resource(env, capacity=10000)
+        env.process(source(env, pool, r))
+        env.run()
+        return pool.count
+
+    assert benchmark(sim) == 0
+
+
+@pytest.mark.benchmark(group='simulation')
+def test_reneging_sim(benchmark):
+    """Most callers hang up before they reach the front of a long queue."""
+    def caller(env, resource, patience):
+        with resource.request() as req:
+            result = yield req | env.timeout(patience)
+            if req in result:
+                yield env.timeout(10)
+
+    def source(env, resource, r):
+        for _ in range(10000):
+            env.process(caller(env, resource, r.uniform(1, 50)))
+            yield env.timeout(0.002)
+
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment()
+        resource = simpy.Resource(env, capacity=10)
+        env.process(source(env, resource, r))
+        env.run()
+        return len(resource.queue)
+
+    assert benchmark(sim) == 0
+
+
+@pytest.mark.benchmark(group='simulation')
+def test_priority_resource_sim(benchmark):
+    """Many concurrent requests with random priorities."""
+    def user(env, resource, priority):
+        with resource.request(priority=priority) as req:
+            yield req
+            yield env.timeout(1)
+
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment()
+        resource = simpy.PriorityResource(env, capacity=2)
+        for _ in range(2000):
+            env.process(user(env, resource, r.randint(0, 100)))
+        env.run()
+        return env.now
+
+    assert benchmark(sim) == 1000
+
+
+@pytest.mark.benchmark(group='simulation')
+def test_preemptive_resource_sim(benchmark):
+    """Many users with random priorities preempting each other."""
+    def user(env, resource, priority, duration):
+        with resource.request(priority=priority) as req:
+            try:
+                yield req
+                yield env.timeout(duration)
+            except simpy.Interrupt:
+                pass
+
+    def source(env, resource, r):
+        for _ in range(5000):
+            env.process(user(env, resource, r.randint(0, 100),
+                             r.randint(1, 100)))
+            yield env.timeout(0.01)
+
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment()
+        resource = simpy.PreemptiveResource(env, capacity=500)
+        env.process(source(env, resource, r))
+        env.run()
+        return len(resource.users)
+
+    assert benchmark(sim) == 0
+
+
 @pytest.mark.benchmark(group='simulation')
 def test_container_sim(benchmark):
     def producer(env, container, full_event):
@@ -161,3 +540,76 @@ def test_container_sim(benchmark):
 
     num_events = benchmark(sim)
     assert num_events == 104
+
+
+@pytest.mark.benchmark(group='simulation')
+@pytest.mark.parametrize('policy', ['fifo', 'smallest', 'best-fit'])
+def test_container_policy_sim(benchmark, policy):
+    """Thousands of consumers of varying sizes waiting at a tank."""
+    def consumer(env, tank, r):
+        while True:
+            yield tank.get(r.randint(1, 100))
+            yield env.timeout(r.randint(1, 100))
+
+    def supplier(env, tank):
+        for _ in range(1000):
+            yield env.timeout(1)
+            yield tank.put(1000)
+
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment()
+        tank = simpy.Container(env, policy=policy)
+        for _ in range(5000):
+            env.process(consumer(env, tank, r))
+        env.process(supplier(env, tank))
+        env.run(until=1000)
+        return len(tank.get_queue) > 0
+
+    assert benchmark(sim)
+
+
+@pytest.mark.benchmark(group='queue')
+@pytest.mark.parametrize('Queue', [HeapQueue, CalendarQueue, LadderQueue,
+                                   TimingWheel])
+@pytest.mark.parametrize('pending', [1000, 100000])
+def test_queue_hold(benchmark, Queue, pending):
+    """Classic *hold* model: A large number of timeouts is pending and each
+    processed timeout schedules a new one."""
+    r = random.Random(1234)
+    env = simpy.Environment(queue=Queue())
+
+    def hold(event):
+        env.timeout(r.expovariate(1)).callbacks.append(hold)
+
+    for _ in range(pending):
+        hold(None)
+
+    def sim():
+        for _ in range(10000):
+            env.step()
+        return len(env._queue)
+
+    assert benchmark(sim) == pending
+
+
+@pytest.mark.benchmark(group='queue')
+@pytest.mark.parametrize('Queue', [HeapQueue, LadderQueue, TimingWheel])
+def test_retransmission_sim(benchmark, Queue):
+    """Many senders, each starting a retransmission timeout for a packet that
+    is cancelled once the packet has been acknowledged."""
+    def sim():
+        r = random.Random(1234)
+        env = simpy.Environment(queue=Queue())
+
+        def send(event):
+            rto = env.timeout(1000)
+            ack = env.timeout(r.randint(1, 20))
+            ack.callbacks.append(lambda event: (rto.cancel(), send(event)))
+
+        for _ in range(1000):
+            send(None)
+        env.run(until=100)
+        return env.now
+
+    assert benchmark(sim) == 100
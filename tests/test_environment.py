@@ -3,8 +3,13 @@ General test for the the `simpy.core.Environment`.
 
 """
 # Pytest gets the parameters "env" and "log" from the *conftest.py* file
+import random
+from heapq import heappush
+
 import pytest
 
+import simpy
+
 
 def test_event_queue_empty(env, log):
     """The simulation should stop if there are no more events, that means, no
@@ -70,3 +75,117 @@ def test_run_with_untriggered_event(env):
     excinfo = pytest.raises(RuntimeError, env.run, until=env.event())
     assert str(excinfo.value).startswith('No scheduled events left but "until"'
                                          ' event was not triggered:')
+
+
+def test_schedule_order_with_lanes():
+    """Events scheduled for the current time are processed in the same
+    ``(time, priority, eid)`` order as all other events."""
+    class HeapOnlyEnvironment(simpy.Environment):
+        def schedule(self, event, priority=1, delay=0):
+            heappush(self._queue,
+                     (self._now + delay, priority, next(self._eid), event))
+
+    def simulate(env):
+        r = random.Random(42)
+        log = []
+
+        def callback(event):
+            log.append((env.now, event.value))
+            if len(log) < 2000:
+                for _ in range(r.randint(0, 2)):
+                    schedule(r.choice([0, 0, 0, 1]))
+
+        def schedule(delay):
+            event = env.event()
+            event._ok = True
+            event._value = len(log), r.random()
+            event.callbacks.append(callback)
+            env.schedule(event, r.choice([-1, 0, 1, 1, 2]), delay)
+
+        for _ in range(10):
+            schedule(r.choice([0, 1]))
+        env.run()
+        return log
+
+    assert simulate(simpy.Environment()) == simulate(HeapOnlyEnvironment())
+
+
+def test_peek_lane(env):
+    """Events in the zero-delay lanes are taken into account by peek()."""
+    env.timeout(1)
+    assert env.peek() == 1
+    env.event().succeed()
+    assert env.peek() == 0
+    env.step()
+    assert env.peek() == 1
+
+
+def test_run_max_steps(env):
+    """run() processes at most *max_steps* events and can be resumed."""
+    for i in range(1, 6):
+        env.timeout(i)
+
+    assert env.run(max_steps=2) is None
+    assert env.now == 2
+    assert env.run(until=10, max_steps=2) is None
+    assert env.now == 4
+
+    # The until event of the previous run does not stop this one.
+    env.timeout(7)
+    env.run(until=8)
+    assert env.now == 8
+
+
+def test_run_max_steps_until_event(env):
+    """An until event that is not reached within *max_steps* is detached."""
+    until = env.timeout(3, value='spam')
+    env.timeout(1)
+    assert env.run(until=until, max_steps=1) is None
+    assert until.callbacks == []
+    assert env.run(until=until) == 'spam'
+
+
+def test_run_patched_step(env):
+    """run() calls step() for each event if it has been replaced."""
+    steps = []
+    step = env.step
+
+    def patched_step():
+        steps.append(env.peek())
+        step()
+
+    env.step = patched_step
+    for i in range(3):
+        env.timeout(i)
+    env.run(until=5)
+    assert steps == [0, 1, 2, 5]
+    assert env.now == 5
+
+
+def test_integer_time():
+    """With a resolution, the environment uses exact integer ticks."""
+    env = simpy.Environment(resolution=1e-3)
+    assert env.resolution == 1e-3
+    log = []
+
+    def pem(env, log):
+        for _ in range(10):
+            yield env.timeout(env.to_ticks(0.1))
+            log.append(env.now)
+
+    env.process(pem(env, log))
+    env.run(until=500)
+    assert log == [100, 200, 300, 400]
+    assert env.now == 500 and type(env.now) is int
+
+    env.run()
+    assert env.now == 1000 and type(env.now) is int
+    assert env.from_ticks(env.now) == 1.0
+
+
+def test_integer_time_type_errors():
+    env = simpy.Environment(resolution=1)
+    pytest.raises(TypeError, env.timeout, 1.5)
+    pytest.raises(TypeError, env.run, 1.5)
+    pytest.raises(TypeError, simpy.Environment, 0.5, resolution=1)
+    pytest.raises(ValueError, simpy.Environment, resolution=0)
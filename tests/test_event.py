@@ -4,9 +4,12 @@ Tests for ``simpy.events.Event``.
 """
 # Pytest gets the parameters "env" and "log" from the *conftest.py* file
 import re
+import weakref
 
 import pytest
 
+import simpy
+
 
 def test_succeed(env):
     """Test for the Environment.event() helper function."""
@@ -108,3 +111,35 @@ def test_callback_modification(env):
     event.callbacks.append(callback)
     event.succeed()
     env.run(until=event)
+
+
+def test_slots(env):
+    """Events have no instance dictionary and do not accept undeclared
+    attributes."""
+    for event in [env.event(), env.timeout(1), env.all_of([])]:
+        assert not hasattr(event, '__dict__')
+        pytest.raises(AttributeError, setattr, event, 'spam', 1)
+
+
+def test_weakref(env):
+    """Events, including processes, can be weakly referenced."""
+    def pem(env):
+        yield env.timeout(1)
+
+    events = [env.event(), env.timeout(1), env.process(pem(env)),
+              env.all_of([])]
+    refs = [weakref.ref(event) for event in events]
+    assert [ref() for ref in refs] == events
+
+
+def test_subclass_attributes(env):
+    """Subclasses without ``__slots__`` may store arbitrary attributes."""
+    class MyEvent(simpy.Event):
+        pass
+
+    event = MyEvent(env)
+    event.spam = 'eggs'
+    event.succeed()
+    env.run()
+    assert event.spam == 'eggs'
+    assert event.processed
@@ -119,8 +119,6 @@ def test_exception_chaining(env):
           File "{path}tests/test_exceptions.py", line {line}, in test_exception_chaining
             env.run()
           File "{path}simpy/core.py", line {line}, in run
-            self.step()
-          File "{path}simpy/core.py", line {line}, in step
             raise exc
         RuntimeError: foo
         """)).replace(r'\{line\}', r'\d+').replace(r'\{path\}', r'.*')  # NOQA
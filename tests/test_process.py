@@ -203,3 +203,167 @@ def test_error_and_interrupted_join(env):
 
     env.process(parent(env))
     pytest.raises(AttributeError, env.run)
+
+
+def test_callback_process(env, log):
+    """A callback process calls its step function with the processed events
+    until it returns None."""
+    class Agent(object):
+        def __init__(self, env):
+            self.env = env
+            self.count = 0
+
+        def step(self, event):
+            log.append((self.env.now, event.value))
+            if self.count == 3:
+                return None
+            self.count += 1
+            return self.env.timeout(1, value=self.count)
+
+    proc = env.callback_process(Agent(env).step)
+    assert proc.is_alive
+    env.run()
+    assert not proc.is_alive
+    assert log == [(0, None), (1, 1), (2, 2), (3, 3)]
+    assert proc.value is None
+
+
+def test_callback_process_exit(env):
+    """The argument of StopIteration becomes the value of the process."""
+    def step(event):
+        if event.value == 'done':
+            env.exit(42)
+        return env.timeout(1, value='done')
+
+    def parent(env):
+        result = yield env.callback_process(step)
+        assert result == 42
+        assert env.now == 1
+
+    env.process(parent(env))
+    env.run()
+
+
+def test_callback_process_processed_event(env, log):
+    """The step function is called again immediately for events that have
+    already been processed."""
+    event = env.event().succeed('spam')
+    env.run()
+
+    def step(ev):
+        log.append(ev.value)
+        return event if ev is not event else None
+
+    env.callback_process(step)
+    env.run()
+    assert log == [None, 'spam']
+
+
+def test_callback_process_interrupt(env, log):
+    """Interrupts are passed to the step function as failed events. The step
+    function handles them by defusing them."""
+    def step(event):
+        if not event.ok:
+            event.defused = True
+            log.append((env.now, event.value.cause))
+            return None
+        return env.timeout(10)
+
+    def attacker(env, victim):
+        yield env.timeout(1)
+        victim.interrupt('spam')
+
+    victim = env.callback_process(step)
+    env.process(attacker(env, victim))
+    env.run()
+    assert log == [(1, 'spam')]
+
+
+def test_callback_process_ignored_interrupt(env, log):
+    """A process whose step function ignores a failed event fails with its
+    exception, like a generator that does not catch it."""
+    def step(event):
+        log.append(env.now)
+        return env.timeout(3)
+
+    def attacker(env, victim):
+        yield env.timeout(2.5)
+        victim.interrupt('stop')
+        try:
+            yield victim
+        except Interrupt as interrupt:
+            log.append(('failed', env.now, interrupt.cause))
+
+    victim = env.callback_process(step)
+    env.process(attacker(env, victim))
+    env.run()
+    assert log == [0, 2.5, ('failed', 2.5, 'stop')]
+    assert not victim.is_alive
+
+
+def test_callback_process_reraise(env):
+    """A step function can fail the process by raising the exception of
+    a failed event."""
+    def step(event):
+        if not event.ok:
+            raise event.value
+        return env.timeout(3)
+
+    def attacker(env, victim):
+        yield env.timeout(1)
+        victim.interrupt('stop')
+
+    victim = env.callback_process(step)
+    env.process(attacker(env, victim))
+    with pytest.raises(Interrupt) as excinfo:
+        env.run()
+    assert excinfo.value.cause == 'stop'
+
+
+def test_callback_process_error(env):
+    """Exceptions of the step function fail the process."""
+    def step(event):
+        raise ValueError('onoes')
+
+    def parent(env):
+        try:
+            yield env.callback_process(step)
+        except ValueError as e:
+            assert e.args[0] == 'onoes'
+
+    env.process(parent(env))
+    env.run()
+
+
+def test_callback_process_invalid(env):
+    pytest.raises(ValueError, env.callback_process, 'spam')
+
+    env.callback_process(lambda event: 'spam')
+    with pytest.raises(RuntimeError) as excinfo:
+        env.run()
+    assert 'Invalid step result "spam"' in str(excinfo.value)
+
+
+def test_callback_process_subclass(env):
+    """Subclasses can override step() and keep their state in slots."""
+    from simpy import CallbackProcess
+
+    class Walker(CallbackProcess):
+        __slots__ = ('position',)
+
+        def __init__(self, env):
+            self.position = 0
+            super(Walker, self).__init__(env)
+
+        def step(self, event):
+            if self.position == 3:
+                return None
+            self.position += 1
+            return self.env.timeout(1)
+
+    walker = Walker(env)
+    assert not hasattr(walker, '__dict__')
+    env.run()
+    assert walker.position == 3
+    assert env.now == 3
+    assert repr(walker).startswith('<Walker(step) object at ')
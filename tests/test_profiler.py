@@ -0,0 +1,123 @@
+"""
+Tests for the process profiling of ``simpy.profiler``.
+
+"""
+# Pytest gets the parameters "env" and "log" from the *conftest.py* file
+from functools import partial
+from itertools import count
+
+from simpy.events import Interrupt
+from simpy.profiler import Profiler
+
+
+def ticks():
+    """Return a clock that advances by one second per call."""
+    return partial(next, count())
+
+
+def car(env):
+    for i in range(3):
+        yield env.timeout(1)
+
+
+def bike(env):
+    yield env.timeout(1)
+
+
+def test_profiler(env):
+    env.profiler = profiler = Profiler(clock=ticks())
+    cars = [env.process(car(env)) for i in range(2)]
+    bikes = [env.process(bike(env))]
+    env.run()
+
+    # Each process is resumed once for its initialization and once per
+    # timeout. A resume takes one tick of the clock.
+    assert profiler.resumes == 10
+    assert profiler.time == 10
+    assert profiler.processes() == [
+        (cars[0], 4, 4), (cars[1], 4, 4), (bikes[0], 2, 2)]
+    assert profiler.functions() == [
+        ('Process(car)', 2, 8, 8), ('Process(bike)', 1, 2, 2)]
+
+
+def test_profiler_report(env):
+    env.profiler = profiler = Profiler(clock=ticks())
+    env.process(car(env))
+    env.process(bike(env))
+    env.run()
+
+    lines = profiler.report().splitlines()
+    assert len(lines) == 3
+    assert lines[0].split() == [
+        'processes', 'resumes', 'time', '[s]', 'per', 'resume', 'function']
+    assert lines[1].split() == [
+        '1', '4', '4.000000', '1.000000000', 'Process(car)']
+    assert profiler.report(limit=1).splitlines() == lines[:2]
+
+    profiler.clear()
+    assert profiler.processes() == []
+    assert profiler.report().splitlines() == lines[:1]
+
+
+def test_profiler_failure_and_interrupt(env):
+    def victim(env):
+        try:
+            yield env.timeout(1)
+        except Interrupt:
+            pass
+
+    def child(env):
+        yield env.timeout(1)
+        raise ValueError('Onoes!')
+
+    def parent(env, proc):
+        try:
+            yield proc
+        except ValueError:
+            pass
+        yield env.timeout(5)
+
+    def interrupter(env, proc):
+        proc.interrupt()
+        yield env.timeout(0)
+
+    env.profiler = profiler = Profiler(clock=ticks())
+    env.process(interrupter(env, env.process(victim(env))))
+    proc = env.process(parent(env, env.process(child(env))))
+    env.run(until=2)
+
+    stats = dict((p._desc(), resumes) for p, resumes, _ in
+                 profiler.processes())
+    # The victim is resumed for its initialization and its interrupt.
+    assert stats == {'Process(victim)': 2, 'Process(interrupter)': 2,
+                     'Process(child)': 2, 'Process(parent)': 2}
+    assert proc.is_alive
+
+
+def test_profiler_callback_process(env):
+    def step(event):
+        return env.timeout(1) if env.now < 2 else None
+
+    env.profiler = profiler = Profiler(clock=ticks())
+    proc = env.callback_process(step)
+    env.run()
+
+    assert profiler.processes() == [(proc, 3, 3)]
+    assert profiler.functions() == [('CallbackProcess(step)', 1, 3, 3)]
+
+
+def test_profiler_toggle(env):
+    def pem(env):
+        for i in range(4):
+            if i == 2:
+                env.profiler = None
+            yield env.timeout(1)
+
+    profiler = Profiler(clock=ticks())
+    proc = env.process(pem(env))
+    env.run(until=0.5)
+    env.profiler = profiler
+    env.run()
+
+    # The profiler is removed during the second resume but still records it.
+    assert profiler.processes() == [(proc, 2, 2)]
@@ -0,0 +1,146 @@
+"""
+Tests for the event queues in ``simpy.queues``.
+
+"""
+import random
+from functools import partial
+
+import pytest
+
+import simpy
+from simpy.core import Infinity
+from simpy.queues import CalendarQueue, HeapQueue, LadderQueue, TimingWheel
+
+
+# The small timing wheel has a horizon of 16 ticks of 0.25, so that its
+# levels and its far heap are exercised by the tests.
+queue_types = [HeapQueue, CalendarQueue, LadderQueue, TimingWheel,
+               partial(TimingWheel, width=0.25, slots=4, levels=2)]
+
+
+@pytest.fixture(params=queue_types)
+def queue(request):
+    return request.param()
+
+
+def hold(queue, seed, n, steps, times):
+    """Run the classic *hold* model on *queue*: keep *n* items in the queue,
+    repeatedly pop the smallest one and push a new one with a time drawn from
+    *times*. Return all popped items."""
+    r = random.Random(seed)
+    eid = 0
+    now = 0
+    popped = []
+    for _ in range(n):
+        queue.push((now + times(r), r.randint(0, 1), eid, None))
+        eid += 1
+    for _ in range(steps):
+        item = queue.pop()
+        now = item[0]
+        popped.append(item)
+        for _ in range(r.randint(0, 2)):
+            queue.push((now + times(r), r.randint(0, 1), eid, None))
+            eid += 1
+    while len(queue):
+        popped.append(queue.pop())
+    return popped
+
+
+@pytest.mark.parametrize('times', [
+    lambda r: r.expovariate(1),
+    lambda r: r.randint(0, 3),
+    lambda r: r.choice([0, 0, 0, 1000]),
+    lambda r: r.uniform(0, 1e-6),
+    lambda r: r.choice([0, 1, Infinity]),
+])
+def test_queue_order(queue, times):
+    """Items are always returned in ``(time, priority, eid)`` order."""
+    popped = hold(queue, 42, 500, 3000, times)
+    for a, b in zip(popped, popped[1:]):
+        assert a[0] <= b[0]
+    assert popped == hold(HeapQueue(), 42, 500, 3000, times)
+
+
+def test_queue_empty(queue):
+    pytest.raises(IndexError, queue.pop)
+    pytest.raises(IndexError, queue.peek)
+    assert len(queue) == 0
+
+
+def test_queue_peek(queue):
+    for eid, time in enumerate([5, 3, 3, 8]):
+        queue.push((time, 1, eid, None))
+    assert queue.peek() == (3, 1, 1, None)
+    queue.push((3, 0, 4, None))
+    assert queue.peek() == (3, 0, 4, None)
+    assert len(queue) == 5
+    assert sorted(queue) == sorted([(5, 1, 0, None), (3, 1, 1, None),
+                                    (3, 1, 2, None), (8, 1, 3, None),
+                                    (3, 0, 4, None)])
+    assert [queue.pop()[2] for _ in range(5)] == [4, 1, 2, 0, 3]
+
+
+@pytest.mark.parametrize('Queue', queue_types)
+def test_environment_queue(Queue, log):
+    """Simulations produce the same results with every queue."""
+    def pem(env, log, i):
+        while env.now < 20:
+            log.append((env.now, i))
+            yield env.timeout(i % 3 + 0.5) | env.timeout(1.5)
+
+    env = simpy.Environment(queue=Queue())
+    for i in range(10):
+        env.process(pem(env, log, i))
+    env.run()
+
+    ref = []
+    env = simpy.Environment()
+    for i in range(10):
+        env.process(pem(env, ref, i))
+    env.run()
+
+    assert log == ref
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'width': 0}, {'buckets': 0},
+])
+def test_calendar_queue_args(kwargs):
+    pytest.raises(ValueError, CalendarQueue, **kwargs)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'threshold': 0}, {'max_rungs': 0},
+])
+def test_ladder_queue_args(kwargs):
+    pytest.raises(ValueError, LadderQueue, **kwargs)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'width': 0}, {'slots': 1}, {'slots': 6}, {'levels': 0},
+])
+def test_timing_wheel_args(kwargs):
+    pytest.raises(ValueError, TimingWheel, **kwargs)
+
+
+def test_timing_wheel_peek_push():
+    """Items pushed before the tick the wheel has advanced to by peek() are
+    still returned in order."""
+    queue = TimingWheel(slots=4, levels=2)
+    queue.push((100, 1, 0, None))
+    queue.push((9.5, 1, 1, None))
+    assert queue.peek() == (9.5, 1, 1, None)
+    queue.push((2, 1, 2, None))
+    queue.push((9.5, 0, 3, None))
+    assert [queue.pop()[2] for _ in range(4)] == [2, 3, 1, 0]
+
+
+def test_timing_wheel_purge():
+    queue = TimingWheel(slots=4, levels=2)
+    items = [(time, 1, eid, object()) for eid, time in enumerate(
+        [0, 1, 3, 7, 20, 50, Infinity])]
+    for item in items:
+        queue.push(item)
+    queue.purge(set(item[3] for item in items[::2]))
+    assert len(queue) == 3
+    assert [queue.pop() for _ in range(3)] == items[1::2]
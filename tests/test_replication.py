@@ -0,0 +1,155 @@
+"""
+Tests for the independent replications of ``simpy.replication``.
+
+"""
+import os
+import random
+import time
+from functools import partial
+
+import pytest
+
+from simpy.core import Environment
+from simpy.replication import ProcessPoolExecutor, Replication, replicate
+
+
+def model(env, seed):
+    """Wait three times for a random delay and return the total delay."""
+    def pem(env):
+        for i in range(3):
+            yield env.timeout(random.randint(1, 10))
+
+    env.process(pem(env))
+    env.run()
+    return env.now
+
+
+def failing_model(env, seed):
+    if seed == 2:
+        raise ValueError('Onoes, seed %s!' % seed)
+    return model(env, seed)
+
+
+def crashing_model(env, seed):
+    if seed == 2:
+        os._exit(1)
+    return model(env, seed)
+
+
+def slow_crashing_model(env, seed):
+    if seed == 2:
+        # Crash while the consumer is still handling the first result.
+        time.sleep(0.3)
+        os._exit(1)
+    return seed
+
+
+def test_replicate():
+    results = list(replicate(model, range(3), workers=1))
+
+    assert [result.seed for result in results] == [0, 1, 2]
+    for result in results:
+        random.seed(result.seed)
+        assert result.value == sum(random.randint(1, 10) for i in range(3))
+        assert result.ok and result.exception is None
+        # Initialize, three timeouts and the process itself.
+        assert result.events == 5
+        assert result.time >= 0
+
+
+def test_replicate_events():
+    def unfinished(env, seed):
+        env.timeout(1)
+        env.timeout(2)
+        env.run(until=1.5)
+
+    result, = replicate(unfinished, [0], workers=1)
+    # Only the first timeout has been processed. The second one is still
+    # queued and the stop event of run() does not count.
+    assert result.events == 1
+
+
+def test_replicate_events_cancelled():
+    def cancelling(env, seed):
+        timeouts = [env.timeout(2) for _ in range(100)]
+        env.timeout(1)
+        for timeout in timeouts:
+            timeout.cancel()
+        env.run()
+
+    result, = replicate(cancelling, [0], workers=1)
+    assert result.events == 1
+
+
+def test_replicate_events_custom_environment():
+    result, = replicate(lambda env, seed: seed, [0], workers=1,
+                        environment=object)
+    assert result.ok and result.value == 0
+    assert result.events is None
+
+
+def test_replicate_exception():
+    results = sorted(replicate(failing_model, range(3), workers=1))
+
+    assert [result.ok for result in results] == [True, True, False]
+    assert results[2].value is None
+    assert type(results[2].exception) is ValueError
+    assert results[2].exception.args == ('Onoes, seed 2!',)
+
+
+def test_replicate_environment():
+    def time_type(env, seed):
+        env.run(until=1)
+        return type(env.now)
+
+    results = replicate(time_type, [0], workers=1,
+                        environment=partial(Environment, resolution=1))
+    assert next(results).value is int
+
+
+def test_replicate_invalid_workers():
+    with pytest.raises(ValueError) as exc_info:
+        replicate(model, range(3), workers=0)
+    assert exc_info.value.args[0] == 'workers(=0) must be >= 1.'
+
+
+parallel = pytest.mark.skipif(ProcessPoolExecutor is None,
+                              reason='requires concurrent.futures')
+
+
+@parallel
+def test_replicate_parallel():
+    results = sorted(replicate(failing_model, range(10), workers=2))
+    expected = sorted(replicate(failing_model, range(10), workers=1))
+
+    assert [r[:2] + r[3:4] for r in results] == [
+        r[:2] + r[3:4] for r in expected]
+    assert str(results[2].exception) == str(expected[2].exception)
+
+
+@parallel
+def test_replicate_crash():
+    results = sorted(replicate(crashing_model, range(6), workers=2))
+
+    assert [result.seed for result in results] == list(range(6))
+    assert [result.ok for result in results] == [
+        True, True, False, True, True, True]
+    assert results[2] == Replication(2, None, results[2].exception, None,
+                                     None)
+    assert 'BrokenProcessPool' in type(results[2].exception).__name__
+
+
+@parallel
+def test_replicate_crash_slow_consumer():
+    """The pool may break while the consumer handles a result. Replications
+    that cannot be submitted to the broken pool are repeated as well."""
+    results = []
+    for result in replicate(slow_crashing_model, range(8), workers=2):
+        results.append(result)
+        if len(results) == 1:
+            time.sleep(1)
+
+    results.sort()
+    assert [result.seed for result in results] == list(range(8))
+    assert [result.ok for result in results] == [
+        True, True, False, True, True, True, True, True]
@@ -3,9 +3,14 @@ Theses test cases demonstrate the API for shared resources.
 
 """
 # Pytest gets the parameters "env" and "log" from the *conftest.py* file
+import random
+from collections import deque
+
 import pytest
 
 import simpy
+from simpy.resources.base import RequestQueue
+from simpy.resources.resource import SortedQueue
 
 
 #
@@ -214,6 +219,100 @@ def test_resource_with_priority_queue(env):
     env.run()
 
 
+def test_request_queue():
+    """Events can be removed from anywhere in a request queue. The remaining
+    events keep their order."""
+    events = [object() for _ in range(10)]
+    queue = RequestQueue()
+    for event in events:
+        queue.append(event)
+
+    for event in events[:3] + events[4:8]:
+        queue.remove(event)
+    pytest.raises(ValueError, queue.remove, events[0])
+
+    rest = [events[3], events[8], events[9]]
+    assert list(queue) == rest
+    assert len(queue) == 3
+    assert events[3] in queue and events[0] not in queue
+    assert queue[0] is events[3]
+    assert queue[1] is events[8]
+    assert queue[-1] is events[9]
+    assert queue.pop(1) is events[8]
+    assert queue.pop(0) is events[3]
+    assert queue.pop() is events[9]
+    assert len(queue) == 0
+    pytest.raises(IndexError, queue.pop, 0)
+
+    # Removed events can be appended again.
+    queue.append(events[0])
+    assert list(queue) == [events[0]]
+
+
+def test_request_queue_list_api():
+    """Request queues can be compared to lists and searched like them."""
+    events = [object() for _ in range(3)]
+    queue = RequestQueue()
+    for event in events:
+        queue.append(event)
+
+    assert queue == events
+    assert not queue != events
+    assert queue != events[:2]
+    assert queue != tuple(events)
+    other = RequestQueue()
+    other.append(events[0])
+    assert queue != other
+    assert queue.index(events[1]) == 1
+    assert queue.count(events[2]) == 1
+    queue.remove(events[2])
+    assert queue.count(events[2]) == 0
+    pytest.raises(ValueError, queue.index, events[2])
+
+
+def test_request_queue_types(env):
+    """Custom resources keep plain lists, which their _do_get() may scan past
+    the first request. Only the built-in resources use request queues."""
+    class Pool(simpy.resources.base.BaseResource):
+        def _do_put(self, event):
+            event.succeed()
+
+        def _do_get(self, event):
+            # Never grant a request, but keep scanning the queue.
+            return True
+
+    pool = Pool(env, 1)
+    for _ in range(3):
+        pool.get()
+    assert type(pool.get_queue) is list
+    assert len(pool.get_queue) == 3
+    for resource in (simpy.Resource(env), simpy.Container(env),
+                     simpy.Store(env)):
+        assert type(resource.put_queue) is RequestQueue
+        assert type(resource.get_queue) is RequestQueue
+
+
+def test_resource_cancel_queued_requests(env):
+    """Cancelled requests leave the queue of a resource, the others are
+    granted in FIFO order."""
+    resource = simpy.Resource(env, capacity=1)
+    log = []
+
+    def user(name, patience):
+        with resource.request() as req:
+            result = yield req | env.timeout(patience)
+            if req in result:
+                log.append((name, env.now))
+                yield env.timeout(2)
+
+    for name, patience in enumerate([10, 1, 3, 1, 10]):
+        env.process(user(name, patience))
+    env.run()
+
+    assert log == [(0, 0), (2, 2), (4, 4)]
+    assert len(resource.queue) == 0
+
+
 def test_sorted_queue_maxlen(env):
     """Requests must fail if more than *maxlen* requests happen
     concurrently."""
@@ -237,6 +336,30 @@ def test_sorted_queue_maxlen(env):
     env.run()
 
 
+def test_sorted_queue_order():
+    """Events are sorted by their key and keep their insertion order if the
+    keys are equal. They can be removed from anywhere in the queue."""
+    class Item(object):
+        def __init__(self, key):
+            self.key = key
+
+    r = random.Random(42)
+    items = [Item((r.randint(0, 5), r.randint(0, 3))) for _ in range(200)]
+    queue = SortedQueue()
+    for item in items:
+        queue.append(item)
+    assert list(queue) == sorted(items, key=lambda item: item.key)
+
+    for item in items[::3]:
+        queue.remove(item)
+    rest = sorted([item for i, item in enumerate(items) if i % 3],
+                  key=lambda item: item.key)
+    assert queue.pop(0) is rest[0]
+    assert queue.pop() is rest[-1]
+    assert list(queue) == rest[1:-1]
+    pytest.raises(ValueError, queue.remove, items[0])
+
+
 def test_get_users(env):
     def process(env, resource):
         with resource.request() as req:
@@ -254,6 +377,30 @@ def test_get_users(env):
     assert [evt.proc for evt in resource.queue] == procs[2:]
 
 
+def test_users_release_order(env):
+    """Users can release the resource in any order. The remaining users keep
+    the order in which they were granted."""
+    def process(env, resource, duration):
+        with resource.request() as req:
+            yield req
+            yield env.timeout(duration)
+
+    resource = simpy.Resource(env, 4)
+    procs = [env.process(process(env, resource, duration))
+             for duration in [3, 1, 4, 2]]
+    env.run(until=1.5)
+    assert [evt.proc for evt in resource.users] == [procs[0], procs[2],
+                                                    procs[3]]
+    assert resource.users[0].proc is procs[0]
+    assert resource.users[-1].proc is procs[3]
+    assert resource.count == 3
+    assert repr(resource.users).startswith('[<Request() object at ')
+
+    env.run()
+    assert resource.count == 0
+    assert repr(resource.users) == '[]'
+
+
 #
 # Tests for PreemptiveResource
 #
@@ -369,6 +516,29 @@ def test_nested_preemption(env, log):
     assert log == [(1, 0, (p1, 0, res1)), (6, 1), (21, 2, (p3, 20, res0)),
         (26, 3), (31, 4)]
 
+
+def test_preemption_victim(env, log):
+    """The user with the largest key is preempted. Of several users with equal
+    keys, the one that got the resource last is preempted."""
+    def process(id, env, res, delay, prio, log):
+        yield env.timeout(delay)
+        with res.request(priority=prio) as req:
+            try:
+                yield req
+                yield env.timeout(10)
+            except simpy.Interrupt:
+                log.append((env.now, id))
+
+    res = simpy.PreemptiveResource(env, 4)
+    for id, prio in enumerate([1, 3, 2, 3]):
+        env.process(process(id, env, res, 0, prio, log))
+    for id in range(4, 7):
+        env.process(process(id, env, res, id - 3, 0, log))
+
+    env.run()
+    assert log == [(1, 3), (2, 1), (3, 2)]
+
+
 #
 # Tests for Container
 #
@@ -455,6 +625,85 @@ def test_container_init_capacity(env, error, args):
         simpy.Container(*args)
 
 
+@pytest.mark.parametrize(('policy', 'expected'), [
+    ('fifo', [(5, 10), (1, 15), (3, 15), (4, 15), (2, 15)]),
+    ('smallest', [(1, 5), (2, 5), (3, 15), (4, 15), (5, 15)]),
+    ('best-fit', [(4, 5), (1, 10), (5, 15), (3, 15), (2, 15)]),
+])
+def test_container_policy(env, policy, expected):
+    """The policy of a container determines which get requests are served
+    once the level rises."""
+    container = simpy.Container(env, policy=policy)
+    assert container.policy == policy
+    log = []
+
+    def getter(amount):
+        yield container.get(amount)
+        log.append((amount, env.now))
+
+    def putter():
+        for amount in [4, 1, 10]:
+            yield env.timeout(5)
+            yield container.put(amount)
+
+    for amount in [5, 1, 3, 4, 2]:
+        env.process(getter(amount))
+    env.process(putter())
+    env.run()
+
+    assert log == expected
+    assert len(container.get_queue) == 0
+
+
+@pytest.mark.parametrize('policy', ['fifo', 'smallest', 'best-fit'])
+def test_container_policy_equal_amounts(env, policy):
+    """Get requests for equal amounts are served in the order they were
+    made."""
+    container = simpy.Container(env, policy=policy)
+    log = []
+
+    def getter(name, amount):
+        yield container.get(amount)
+        log.append(name)
+
+    def putter():
+        for _ in range(4):
+            yield env.timeout(1)
+            yield container.put(5)
+
+    for name, amount in [('a', 5), ('b', 5), ('c', 5), ('d', 4)]:
+        env.process(getter(name, amount))
+    env.process(putter())
+    env.run()
+
+    expected = ['a', 'b', 'c', 'd'] if policy != 'smallest' else [
+        'd', 'a', 'b', 'c']
+    assert log == expected
+
+
+def test_container_sorted_cancel(env):
+    """Get requests can be cancelled with a sorted policy."""
+    container = simpy.Container(env, policy='best-fit')
+
+    def getter(amount, patience):
+        with container.get(amount) as req:
+            yield req | env.timeout(patience)
+
+    env.process(getter(2, 1))
+    env.process(getter(1, 10))
+    env.run(until=2)
+    assert [ev.amount for ev in container.get_queue] == [1]
+
+    container.put(3)
+    env.run()
+    assert container.level == 2
+    assert len(container.get_queue) == 0
+
+
+def test_container_invalid_policy(env):
+    pytest.raises(ValueError, simpy.Container, env, policy='lifo')
+
+
 #
 # Tests fore Store
 #
@@ -517,6 +766,136 @@ def test_store_cancel(env):
     env.run()
 
 
+def test_store_items(env):
+    """Items assigned to a store are kept in a deque and retrieved in FIFO
+    order."""
+    store = simpy.Store(env)
+    store.items = [1, 2, 3]
+    assert isinstance(store.items, deque)
+
+    def getter(store, log):
+        for _ in range(3):
+            log.append((yield store.get()))
+
+    log = []
+    env.process(getter(store, log))
+    env.run()
+    assert log == [1, 2, 3]
+    assert len(store.items) == 0
+
+
+def test_store_items_list_api(env):
+    """The items of a store can still be compared, sliced and popped like
+    a list."""
+    store = simpy.Store(env)
+    store.items = [1, 2, 3, 4]
+    assert store.items == [1, 2, 3, 4]
+    assert store.items != [1, 2]
+    assert store.items == deque([1, 2, 3, 4])
+    assert store.items[1:] == [2, 3, 4]
+    assert store.items[-1] == 4
+    assert store.items.pop(1) == 2
+    assert store.items.pop(0) == 1
+    assert store.items.pop() == 4
+    assert store.items == [3]
+
+
+def test_priority_store_items(env):
+    """Items assigned to a priority store are converted into a heap."""
+    pstore = simpy.PriorityStore(env)
+    pstore.items = [3, 1, 2]
+
+    def getter(pstore, log):
+        for _ in range(3):
+            log.append((yield pstore.get()))
+
+    log = []
+    env.process(getter(pstore, log))
+    env.run()
+    assert log == [1, 2, 3]
+
+
+def test_store_bulk(env):
+    """Bulk requests put or get all of their items at once and respect the
+    capacity of the store."""
+    store = simpy.Store(env, capacity=5)
+    log = []
+
+    def producer():
+        yield store.put_many(range(3))
+        log.append(('put', env.now))
+        yield store.put_many(range(3, 6))
+        log.append(('put', env.now))
+
+    def consumer():
+        yield env.timeout(1)
+        items = yield store.get_many(2)
+        log.append((items, env.now))
+        items = yield store.get_many(4)
+        log.append((items, env.now))
+
+    env.process(producer())
+    env.process(consumer())
+    env.run()
+
+    assert log == [('put', 0), ([0, 1], 1), ('put', 1), ([2, 3, 4, 5], 1)]
+    assert len(store.items) == 0
+
+
+def test_store_bulk_wakes_waiters(env):
+    """A bulk request may grant several waiting single requests."""
+    store = simpy.Store(env, capacity=3)
+    gets = [store.get() for _ in range(3)]
+    store.put_many('abc')
+    puts = [store.put(item) for item in 'def']
+    env.run()
+    assert [get.value for get in gets] == ['a', 'b', 'c']
+    assert all(put.triggered for put in puts)
+
+    store.get_many(3)
+    env.run()
+    assert list(store.items) == []
+
+
+def test_store_single_requests_order(env):
+    """Without bulk requests, a request only checks the first waiting
+    request, so the order of events is the same as before bulk requests
+    existed."""
+    store = simpy.Store(env)
+    log = []
+
+    def logged(name, event):
+        event.callbacks.append(lambda event: log.append(name))
+
+    for i in range(2):
+        logged('get%s' % i, store.get())
+    for item in 'ab':
+        logged('put_' + item, store.put(item))
+    # The new get request only grants the first waiting one. The second one
+    # is granted once the first put has been processed.
+    logged('get2', store.get())
+    logged('timeout', env.timeout(0))
+    env.run()
+
+    assert log == ['put_a', 'put_b', 'get0', 'timeout', 'get1']
+
+
+def test_store_bulk_bounds(env):
+    store = simpy.Store(env, capacity=2)
+    pytest.raises(ValueError, store.put_many, range(3))
+    pytest.raises(ValueError, store.get_many, 3)
+    pytest.raises(ValueError, store.get_many, 0)
+
+
+def test_priority_store_bulk(env):
+    pstore = simpy.PriorityStore(env)
+    pstore.put_many([3, 1, 2])
+    get = pstore.get_many(2)
+    env.run()
+    assert get.value == [1, 2]
+    assert pstore.items == [3]
+
+
 def test_priority_store_item_priority(env):
     pstore = simpy.PriorityStore(env, 3)
     log = []
@@ -628,8 +1007,7 @@ def test_filter_calls_best_case(env):
 
 
 def test_filter_calls_worst_case(env):
-    """In the worst case the filter function is being called for items multiple
-    times."""
+    """In the worst case the filter function is called for every new item."""
 
     log = []
     store = simpy.FilterStore(env)
@@ -650,16 +1028,163 @@ def test_filter_calls_worst_case(env):
     env.process(putter(store))
     env.run()
 
-    # The filter function is repeatedly called for every item in the store
-    # until a match is found.
+    # The waiting get request is only checked against each new item and gets
+    # the first one that matches.
     assert log == [
             'put 0', 'check 0',
-            'put 1', 'check 0', 'check 1',
-            'put 2', 'check 0', 'check 1', 'check 2',
-            'put 3', 'check 0', 'check 1', 'check 2', 'check 3', 'get 3',
+            'put 1', 'check 1',
+            'put 2', 'check 2',
+            'put 3', 'check 3',
+            'get 3',
     ]
 
 
+def test_filter_store_wakes_matching_getter(env):
+    """A new item is only checked against the waiting get requests until the
+    first one matches it. Items that were in the store before are not checked
+    again for the other requests."""
+    store = simpy.FilterStore(env)
+    checks = []
+    log = []
+
+    def getter(name, wanted):
+        def filter(item):
+            checks.append((name, item))
+            return item == wanted
+        item = yield store.get(filter)
+        log.append((name, item, env.now))
+
+    def putter():
+        for item in 'xyab':
+            yield env.timeout(1)
+            yield store.put(item)
+
+    for name, wanted in enumerate('ab'):
+        env.process(getter(name, wanted))
+    env.process(putter())
+    env.run()
+
+    assert log == [(0, 'a', 3), (1, 'b', 4)]
+    assert checks == [
+        (0, 'x'), (1, 'x'),
+        (0, 'y'), (1, 'y'),
+        (0, 'a'),
+        (1, 'b'),
+    ]
+
+
+def test_filter_store_granted_put(env):
+    """The item of a granted but not yet processed put request goes to the
+    earliest waiting get request, not to a new one."""
+    store = simpy.FilterStore(env)
+    log = []
+
+    def waiter():
+        item = yield store.get(lambda item: item == 'a')
+        log.append(('waiter', item, env.now))
+
+    def latecomer():
+        yield env.timeout(1)
+        store.put('a')
+        get = store.get(lambda item: item == 'a')
+        yield env.timeout(1)
+        assert not get.triggered
+        get.cancel()
+        log.append(('latecomer', None, env.now))
+
+    env.process(waiter())
+    env.process(latecomer())
+    env.run()
+
+    assert log == [('waiter', 'a', 1), ('latecomer', None, 2)]
+    assert store.items == []
+
+
+def test_filter_store_put_many(env):
+    """A bulk put wakes up all get requests matching one of its items."""
+    store = simpy.FilterStore(env)
+    gets = [store.get(lambda item, wanted=wanted: item == wanted)
+            for wanted in 'abc']
+    store.put_many('cxa')
+    env.run()
+    assert [get.value if get.triggered else None for get in gets] == \
+        ['a', None, 'c']
+    assert list(store.items) == ['x']
+    with pytest.raises(TypeError) as exc_info:
+        store.get_many(1)
+    assert exc_info.value.args[0] == 'FilterStore does not support get_many().'
+
+
+def test_keyed_store(env):
+    """Get requests of a keyed store receive the oldest item with their key.
+    Requests for the same key are served in FIFO order."""
+    store = simpy.KeyedStore(env, key=lambda item: item[0])
+    log = []
+
+    def getter(name, key):
+        item = yield store.get(key)
+        log.append((name, item, env.now))
+
+    def putter():
+        for item in ['a1', 'b1', 'a2', 'c1']:
+            yield env.timeout(1)
+            yield store.put(item)
+
+    for name, key in [(0, 'a'), (1, 'b'), (2, 'a')]:
+        env.process(getter(name, key))
+    env.process(putter())
+    env.run()
+
+    assert log == [(0, 'a1', 1), (1, 'b1', 2), (2, 'a2', 3)]
+    assert store.items == ['c1']
+    assert len(store.get_queue) == 0
+
+
+def test_keyed_store_put_many(env):
+    """A bulk put wakes up the get requests for the keys of all its items."""
+    store = simpy.KeyedStore(env)
+    gets = [store.get(key) for key in 'ab']
+    store.put_many('ba')
+    env.run()
+    assert [get.value for get in gets] == ['a', 'b']
+    pytest.raises(TypeError, store.get_many, 1)
+
+
+def test_keyed_store_capacity(env):
+    """Put requests wait until an item has been removed from a full keyed
+    store."""
+    store = simpy.KeyedStore(env, capacity=1)
+    store.items = ['x']
+
+    def getter():
+        yield env.timeout(1)
+        yield store.get('x')
+
+    put = store.put('y')
+    env.process(getter())
+    env.run()
+
+    assert put.triggered
+    assert store.items == ['y']
+
+
+def test_keyed_store_cancel(env):
+    """Cancelled get requests of a keyed store leave the queue."""
+    store = simpy.KeyedStore(env)
+
+    def getter():
+        with store.get('x') as req:
+            yield req | env.timeout(1)
+
+    env.process(getter())
+    env.run()
+    assert len(store.get_queue) == 0
+
+    store.put('x')
+    env.run()
+    assert store.items == ['x']
+
+
 def test_immediate_put_request(env):
     """Put requests that can be fulfilled immediately do not enter the put
     queue."""
@@ -703,3 +1228,78 @@ def test_immediate_get_request(env):
     request = container.get(1)
     assert not request.triggered
     assert len(container.get_queue) == 1
+
+
+#
+# Tests for the resource statistics
+#
+
+
+def test_resource_stats(env):
+    def user(env, res, arrival, duration):
+        yield env.timeout(arrival)
+        with res.request() as req:
+            yield req
+            yield env.timeout(duration)
+
+    res = simpy.Resource(env, capacity=1)
+    assert res.stats is None
+    stats = res.collect_stats()
+    assert res.stats is stats
+    for arrival, duration in [(0, 2), (0, 2), (1, 1)]:
+        env.process(user(env, res, arrival, duration))
+
+    env.run(until=2)
+    assert stats.amount == 1
+    assert stats.put_queue == 1.5
+    env.run()
+    assert env.now == 5
+    assert stats.amount == 1
+    assert stats.put_queue == 1
+    assert stats.get_queue == 0
+    assert (stats.puts, stats.put_wait, stats.put_wait_max) == (3, 5, 3)
+    assert stats.mean_put_wait == 5 / 3
+    assert (stats.gets, stats.get_wait, stats.get_wait_max) == (3, 0, 0)
+
+
+def test_container_stats(env):
+    def producer(env, tank):
+        for _ in range(2):
+            yield env.timeout(1 if env.now == 0 else 2)
+            yield tank.put(5)
+
+    tank = simpy.Container(env, capacity=10)
+    stats = tank.collect_stats()
+    tank.get(8)
+    env.process(producer(env, tank))
+    env.run(until=6)
+
+    assert tank.level == 2
+    assert stats.amount == 16 / 6
+    assert stats.get_queue == 0.5
+    assert (stats.gets, stats.get_wait, stats.mean_get_wait) == (1, 3, 3)
+
+
+def test_store_stats_cancel(env):
+    """Cancelled requests are no longer counted as waiting."""
+    def getter(env, store):
+        yield env.timeout(4)
+        yield store.get()
+
+    store = simpy.Store(env, capacity=1)
+    store.put('a')
+    stats = store.collect_stats()
+    assert stats.amount == 1
+    cancelled = store.put('b')
+    store.put('c')
+    env.process(getter(env, store))
+    env.run(until=2)
+    cancelled.cancel()
+    env.run()
+
+    assert list(store.items) == ['c']
+    assert stats.amount == 1
+    assert stats.put_queue == 6 / 4
+    assert (stats.puts, stats.put_wait) == (1, 4)
+    assert (stats.gets, stats.get_wait) == (1, 0)
+    assert not stats._pending
@@ -1,10 +1,13 @@
 """
-Tests for ``simpy.events.Timeout``.
+Tests for ``simpy.events.Timeout`` and ``simpy.events.Periodic``.
 
 """
 # Pytest gets the parameters "env" and "log" from the *conftest.py* file
 import pytest
 
+import simpy
+from simpy.queues import CalendarQueue, HeapQueue, LadderQueue
+
 
 def test_discrete_time_steps(env, log):
     """envple envulation with discrete time steps."""
@@ -70,3 +73,163 @@ def test_triggered_timeout(env):
         assert value == 'i was already done'
 
     env.run(env.process(process(env)))
+
+
+def test_cancel_timeout(env, log):
+    """A cancelled timeout is never processed."""
+    def pem(env, log):
+        timeout = env.timeout(1)
+        timeout.callbacks.append(lambda event: log.append('timeout'))
+        yield env.timeout(0.5)
+        timeout.cancel()
+        yield env.timeout(1)
+        log.append(env.now)
+
+    env.process(pem(env, log))
+    env.run()
+    assert log == [1.5]
+
+
+def test_cancel_timeout_steps(env):
+    """Cancelled timeouts are skipped and do not advance the time."""
+    timeouts = [env.timeout(i) for i in range(5)]
+    for timeout in timeouts[1::2]:
+        timeout.cancel()
+    timeouts[4].cancel()
+
+    assert env.peek() == 0
+    env.step()
+    assert env.peek() == 2
+    env.step()
+    assert env.now == 2
+    pytest.raises(simpy.core.EmptySchedule, env.step)
+    assert env.now == 2
+
+
+def test_cancel_timeout_twice(env):
+    timeout = env.timeout(1)
+    timeout.cancel()
+    pytest.raises(RuntimeError, timeout.cancel)
+
+
+def test_cancel_processed_timeout(env):
+    timeout = env.timeout(1)
+    env.run()
+    pytest.raises(RuntimeError, timeout.cancel)
+
+
+@pytest.mark.parametrize('Queue', [HeapQueue, CalendarQueue, LadderQueue])
+def test_cancel_timeout_purge(Queue):
+    """Cancelled timeouts are purged from the queue if they make up most of
+    it."""
+    env = simpy.Environment(queue=Queue())
+    log = []
+    timeouts = []
+    for i in range(400):
+        timeout = env.timeout(i % 7, value=i)
+        timeout.callbacks.append(lambda event: log.append(event.value))
+        timeouts.append(timeout)
+
+    # Process some timeouts so that the queue is in use.
+    for _ in range(10):
+        env.step()
+
+    cancelled = [t for t in timeouts[::3] + timeouts[1::3] if not t.processed]
+    for timeout in cancelled:
+        timeout.cancel()
+    size = len(env._queue) + len(env._urgent) + len(env._normal)
+    assert size - len(env._cancelled) == 400 - 10 - len(cancelled)
+    assert size < 200
+
+    env.run()
+    expected = sorted(range(400), key=lambda i: (i % 7, i))
+    assert log == [i for i in expected if i in log[:10] or i % 3 == 2]
+
+
+def test_periodic(env, log):
+    """A periodic event calls its callback on every tick."""
+    env.every(2, lambda event: log.append(env.now))
+    env.run(until=7)
+    assert log == [2, 4, 6]
+
+
+def test_periodic_wait(env, log):
+    """Processes yielding a periodic event are resumed at its next tick."""
+    def pem(env, periodic, log):
+        for _ in range(3):
+            value = yield periodic
+            log.append((env.now, value))
+            yield env.timeout(3)
+
+    periodic = env.every(2, value='tick')
+    env.process(pem(env, periodic, log))
+    env.run(until=20)
+    assert log == [(2, 'tick'), (6, 'tick'), (10, 'tick')]
+
+
+def test_periodic_reuses_callbacks(env):
+    """The callback lists of a periodic event are not reallocated."""
+    periodic = env.every(1)
+    lists = set()
+    for _ in range(5):
+        lists.add(id(periodic.callbacks))
+        periodic.callbacks.append(lambda event: None)
+        env.step()
+        assert len(periodic.callbacks) == 1
+    assert len(lists) == 2
+
+
+def test_periodic_interval(env, log):
+    """A new interval takes effect after the next tick."""
+    def callback(event):
+        log.append(env.now)
+        if env.now == 2:
+            event.interval = 5
+
+    periodic = env.every(1, callback)
+    env.run(until=15)
+    assert log == [1, 2, 3, 8, 13]
+    assert periodic.interval == 5
+
+
+def test_periodic_stop(env, log):
+    def callback(event):
+        log.append(env.now)
+        if env.now == 3:
+            event.stop()
+
+    periodic = env.every(1, callback)
+    env.run()
+    assert log == [1, 2, 3]
+    assert env.now == 3
+    pytest.raises(RuntimeError, periodic.stop)
+
+
+def test_periodic_stop_pending(env, log):
+    """A periodic event can be stopped from outside its callback."""
+    def pem(env, periodic):
+        yield env.timeout(2.5)
+        periodic.stop()
+
+    periodic = env.every(1, lambda event: log.append(env.now))
+    env.process(pem(env, periodic))
+    env.run()
+    assert log == [1, 2]
+    assert env.now == 2.5
+
+
+def test_periodic_invalid_interval(env):
+    pytest.raises(ValueError, env.every, 0)
+    periodic = env.every(1)
+    with pytest.raises(ValueError):
+        periodic.interval = -1
+    assert repr(periodic).startswith('<Periodic(1) object at ')
+
+
+def test_periodic_condition(env):
+    """Periodic events cannot be used in conditions."""
+    periodic = env.every(1, value='tick')
+    timeout = env.timeout(5)
+    pytest.raises(ValueError, lambda: periodic | timeout)
+    pytest.raises(ValueError, lambda: timeout & periodic)
+    pytest.raises(ValueError, env.any_of, [timeout, periodic])
@@ -0,0 +1,152 @@
+"""
+Tests for the event tracing of ``simpy.trace``.
+
+"""
+# Pytest gets the parameters "env" and "log" from the *conftest.py* file
+import pytest
+
+from simpy.events import Initialize, Process, Timeout
+from simpy.trace import TraceBuffer, TraceReader, TraceWriter
+
+
+def pem(env, log):
+    yield env.timeout(1)
+    log.append(env.now)
+
+
+def test_trace_buffer(env, log):
+    env.tracer = buffer = TraceBuffer()
+    proc = env.process(pem(env, log))
+    env.run()
+
+    assert log == [1]
+    assert len(buffer) == buffer.count == 3
+    assert buffer.records() == [
+        (0, 0, 0, Initialize, proc),
+        (1, 1, 1, Timeout, proc),
+        (1, 1, 2, Process, None),
+    ]
+    assert buffer.kinds == [Initialize, Timeout, Process]
+
+
+def test_trace_buffer_wraps(env):
+    env.tracer = buffer = TraceBuffer(capacity=4)
+    for i in range(10):
+        env.timeout(i)
+    env.run()
+
+    assert buffer.count == 10
+    assert len(buffer) == 4
+    assert [record[0] for record in buffer.records()] == [6, 7, 8, 9]
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.records() == []
+
+
+def test_trace_step(env):
+    """Events processed by step() are traced as well."""
+    env.tracer = buffer = TraceBuffer()
+    env.timeout(2)
+    env.step()
+    assert buffer.records() == [(2, 1, 0, Timeout, None)]
+
+
+def test_trace_at_runtime(env):
+    """Tracing can be started and stopped while the simulation is
+    running."""
+    buffer = TraceBuffer()
+
+    def tracing(env):
+        yield env.timeout(1)
+        env.tracer = buffer
+        yield env.timeout(1)
+        env.tracer = None
+        yield env.timeout(1)
+
+    env.process(tracing(env))
+    env.run()
+    assert env.now == 3
+    assert env.tracer is None
+    assert [record[0] for record in buffer.records()] == [2]
+
+
+def test_trace_buffer_capacity():
+    pytest.raises(ValueError, TraceBuffer, 0)
+
+
+def test_trace_file(env, tmpdir):
+    """Events written by a TraceWriter are read back by a TraceReader."""
+    path = str(tmpdir.join('sim.trace'))
+
+    def child(env):
+        yield env.timeout(1)
+
+    def parent(env):
+        yield env.process(child(env))
+
+    with TraceWriter(path, chunk=2) as writer:
+        env.tracer = writer
+        env.process(parent(env))
+        env.run()
+    assert writer.count == 5
+
+    with TraceReader(path) as reader:
+        assert len(reader) == 5
+        assert reader.kinds == ['simpy.events.Initialize',
+                                'simpy.events.Timeout',
+                                'simpy.events.Process']
+        assert reader.process_names == ['Process(parent)', 'Process(child)']
+        assert list(reader) == [
+            (0, 0, 0, 0, 0),
+            (0, 1, 0, 0, 1),
+            (1, 2, 1, 1, 1),
+            (1, 3, 1, 2, 0),
+            (1, 4, 1, 2, -1),
+        ]
+        assert list(reader.time) == [0, 0, 1, 1, 1]
+        assert list(reader.eid) == [0, 1, 2, 3, 4]
+        assert list(reader.priority) == [0, 0, 1, 1, 1]
+        assert list(reader.kind) == [0, 0, 1, 2, 2]
+        assert list(reader.process) == [0, 1, 1, 0, -1]
+
+
+def test_trace_file_unclosed(env, tmpdir):
+    """The records of a trace file can be read before the writer has been
+    closed."""
+    path = str(tmpdir.join('sim.trace'))
+    writer = TraceWriter(path, chunk=4)
+    env.tracer = writer
+    for i in range(10):
+        env.timeout(i)
+    env.run()
+
+    reader = TraceReader(path)
+    assert len(reader) == 8
+    assert list(reader.time) == list(range(8))
+    assert reader.kinds == []
+    reader.close()
+    writer.close()
+
+
+def test_trace_file_numpy(env, tmpdir):
+    numpy = pytest.importorskip('numpy')
+    path = str(tmpdir.join('sim.trace'))
+    with TraceWriter(path) as writer:
+        env.tracer = writer
+        for i in range(10):
+            env.timeout(i)
+        env.run()
+
+    reader = TraceReader(path)
+    time = reader.time
+    assert isinstance(time, numpy.ndarray)
+    assert time.tolist() == list(range(10))
+    assert reader.records['eid'].tolist() == list(range(10))
+    del time
+
+
+def test_trace_file_invalid(tmpdir):
+    path = tmpdir.join('sim.trace')
+    path.write_binary(b'\0' * 64)
+    pytest.raises(ValueError, TraceReader, str(path))